@@ -1,6 +1,8 @@
 """Configuración de fuentes de noticias."""
 
-NEWS_SOURCES = [
+from typing import Tuple
+
+NEWS_SOURCES: Tuple[str, ...] = (
     "https://www.ayuntamientoboadilladelmonte.org/boadilla-actualidad?items_per_page=20",
     "https://www.ayuntamientoboadilladelmonte.org/boadilla-actualidad/noticias",
     "https://www.diariodeboadilla.es/hemeroteca/all",
@@ -11,5 +13,5 @@ NEWS_SOURCES = [
     "https://boadilladigital.es/",
     "https://teleboadilla.com/",
     "https://boadillaesnoticia.es/actualidad/",
-    "https://boadillain.es/noticias/actualidad/boadilla-del-monte/"
-]
\ No newline at end of file
+    "https://boadillain.es/noticias/actualidad/boadilla-del-monte/",
+)
@@ -0,0 +1,44 @@
+"""Modelos de datos de artículos."""
+
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass(slots=True)
+class ScrapedArticles:
+    """
+    Enlaces a artículos encontrados en las fuentes, en formato columnar:
+    urls[i] y dates[i] (None si no se detectó fecha) describen el mismo artículo.
+    """
+    
+    urls: List[str] = field(default_factory=list)
+    dates: List[Optional[str]] = field(default_factory=list)
+    
+    def __len__(self) -> int:
+        return len(self.urls)
+    
+    def __iter__(self) -> Iterator[Tuple[str, Optional[str]]]:
+        return zip(self.urls, self.dates)
+    
+    def append(self, url: str, date: Optional[str] = None) -> None:
+        self.urls.append(url)
+        self.dates.append(date)
+    
+    def take(self, mask: Iterable[bool]) -> "ScrapedArticles":
+        """Devuelve las filas cuya posición en mask es True."""
+        selected = ScrapedArticles()
+        for (url, date), keep in zip(self, mask):
+            if keep:
+                selected.append(url, date)
+        return selected
+
+
+@dataclass(slots=True)
+class SynthesizedArticle:
+    """Artículo final (sintetizado o de fuente única) que se muestra y exporta."""
+    
+    title: str
+    content: str
+    summary: str = ""
+    group_size: int = 1
+    source_urls: List[str] = field(default_factory=list)
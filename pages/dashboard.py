@@ -1,11 +1,13 @@
 import streamlit as st
-import json
-from datetime import datetime, timedelta
+import math
+import orjson
+from datetime import datetime
 
 from services.scraper_service import NewsScraperService
 from services.deduplication_service import DeduplicationService
-from services.article_content_extractor import ArticleContentExtractor
+from services.article_content_extractor import AsyncArticleContentExtractor
 from services.article_synthesis_service import ArticleSynthesisService
+from services.news_pipeline_service import NewsPipelineService
 from config.sources import NEWS_SOURCES
 
 st.set_page_config(
@@ -16,10 +18,20 @@ st.set_page_config(
 
 st.title("📊 Monitor de Noticias")
 
-if 'scraper' not in st.session_state:
-    st.session_state.scraper = NewsScraperService(timeout=15)
+ARTICLES_PER_PAGE = 20
+
+
+@st.cache_resource
+def get_scraper() -> NewsScraperService:
+    """Scraper compartido por todas las sesiones del proceso."""
+    return NewsScraperService(timeout=15)
+
+
+@st.cache_resource
+def get_extractor() -> AsyncArticleContentExtractor:
+    """Extractor compartido: su cache en memoria sobrevive entre reruns y sesiones."""
+    return AsyncArticleContentExtractor(max_concurrent=16)
 
-scraper = st.session_state.scraper
 
 # Sidebar config
 with st.sidebar:
@@ -44,69 +56,65 @@ if st.button("🔍 Escanear y Agrupar Noticias", use_container_width=True, type=
         st.info("Crea el archivo `.streamlit/secrets.toml` con:\n```\nOPENAI_API_KEY = \"sk-your-key-here\"\n```")
         st.stop()
     
-    # Step 1: Extract URLs
-    with st.spinner("📡 Extrayendo URLs de noticias..."):
-        all_articles = scraper.scrape_multiple(NEWS_SOURCES)
-        
-        if not all_articles:
-            st.error("No se encontraron artículos")
-            st.stop()
-        
-        # Filter by date
-        cutoff_date = datetime.now() - timedelta(days=days_threshold)
-        filtered_articles = []
-        no_date_count = 0
-        old_date_count = 0
-        
-        for article in all_articles:
-            if not article.get('date'):
-                no_date_count += 1
-                continue
-            
-            try:
-                article_date = datetime.fromisoformat(article['date'].replace('Z', '+00:00'))
-                if article_date.replace(tzinfo=None) >= cutoff_date:
-                    filtered_articles.append(article)
-                else:
-                    old_date_count += 1
-            except (ValueError, AttributeError):
-                no_date_count += 1
+    try:
+        deduplicator = DeduplicationService(
+            similarity_threshold=0.75,
+            bm25_weight=0.30,
+            openai_api_key=openai_api_key
+        )
+    except Exception as e:
+        st.error(f"Error al inicializar la deduplicación: {e}")
+        import traceback
+        st.code(traceback.format_exc())
+        st.stop()
+    
+    # Steps 1-2: Scraping → filtro por fecha → contenido → embeddings (pipeline en streaming)
+    with st.spinner("📡 Extrayendo noticias y su contenido..."):
+        pipeline = NewsPipelineService(
+            scraper=get_scraper(),
+            extractor=get_extractor(),
+            deduplicator=deduplicator,
+            days_threshold=days_threshold
+        )
         
-        st.session_state.articles_data = filtered_articles
+        status = st.empty()
         
-        st.success(f"✅ {len(filtered_articles)} artículos extraídos")
-        if no_date_count > 0 or old_date_count > 0:
-            st.info(f"ℹ️ Excluidos: {no_date_count} sin fecha, {old_date_count} antiguos")
-    
-    # Step 2: Extract content
-    with st.spinner("📄 Extrayendo contenido de artículos..."):
-        extractor = ArticleContentExtractor()
-        urls = [a['url'] for a in st.session_state.articles_data]
+        def update_pipeline_status(counts):
+            status.caption(
+                f"{counts['scraped']} enlaces · {counts['queued']} recientes · "
+                f"{counts['extracted']} con contenido · {counts['embedded']} embeddings"
+            )
         
-        progress_bar = st.progress(0)
-        url_contents = {}
+        try:
+            result = pipeline.run(NEWS_SOURCES, progress_callback=update_pipeline_status)
+        except Exception as e:
+            status.empty()
+            st.error(f"Error al extraer noticias: {e}")
+            import traceback
+            st.code(traceback.format_exc())
+            st.stop()
         
-        for i, url in enumerate(urls):
-            content = extractor.extract_content(url)
-            if content:
-                url_contents[url] = content
-            progress_bar.progress((i + 1) / len(urls))
+        status.empty()
         
-        progress_bar.empty()
+        if not result.total_scraped:
+            st.error("No se encontraron artículos")
+            st.stop()
         
-        st.session_state.url_contents = url_contents
+        st.session_state.articles_data = result.articles
+        st.session_state.url_contents = url_contents = result.url_contents
         
-        st.success(f"✅ Contenido extraído de {len(url_contents)}/{len(urls)} artículos")
+        st.success(f"✅ {len(result.articles)} artículos extraídos")
+        if result.no_date_count > 0 or result.old_date_count > 0:
+            st.info(f"ℹ️ Excluidos: {result.no_date_count} sin fecha, {result.old_date_count} antiguos")
+        st.success(f"✅ Contenido extraído de {len(url_contents)}/{len(result.articles)} artículos")
     
     # Step 3: Group similar articles
     with st.spinner("🔗 Agrupando artículos similares..."):
         try:
-            deduplicator = DeduplicationService(
-                similarity_threshold=0.75,
-                bm25_weight=0.30,
-                openai_api_key=openai_api_key
+            groups = deduplicator.group_similar_articles(
+                url_contents,
+                precomputed_embeddings=result.embeddings
             )
-            groups = deduplicator.group_similar_articles(url_contents)
             
             st.session_state.groups = groups
             st.session_state.deduplicator_instance = deduplicator
@@ -140,6 +148,12 @@ if st.button("🔍 Escanear y Agrupar Noticias", use_container_width=True, type=
             progress_bar.empty()
             
             st.session_state.synthesized_articles = synthesized
+            # Serializar una sola vez (orjson serializa dataclasses de forma nativa):
+            # los reruns reutilizan los bytes para la descarga
+            st.session_state.synthesized_json = orjson.dumps(
+                synthesized,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            )
             
             st.success(f"✅ {len(synthesized)} artículos sintetizados")
             
@@ -160,19 +174,36 @@ if 'synthesized_articles' in st.session_state:
     with col1:
         st.metric("Artículos", len(articles))
     with col2:
-        multi_source = sum(1 for a in articles if a.get('group_size', 1) > 1)
+        multi_source = sum(1 for a in articles if a.group_size > 1)
         st.metric("Multi-fuente", multi_source)
     with col3:
-        single_source = sum(1 for a in articles if a.get('group_size', 1) == 1)
+        single_source = sum(1 for a in articles if a.group_size == 1)
         st.metric("Fuente única", single_source)
     
+    if 'synthesized_json' in st.session_state:
+        st.download_button(
+            "💾 Descargar JSON",
+            data=st.session_state.synthesized_json,
+            file_name=f"noticias_{datetime.now():%Y%m%d_%H%M}.json",
+            mime="application/json",
+        )
+    
     st.markdown("---")
     
+    # Paginar: solo se renderizan ARTICLES_PER_PAGE expanders por rerun
+    total_pages = max(1, math.ceil(len(articles) / ARTICLES_PER_PAGE))
+    page = 1
+    if total_pages > 1:
+        page = st.number_input("Página", min_value=1, max_value=total_pages, value=1, step=1)
+    
+    page_start = (page - 1) * ARTICLES_PER_PAGE
+    page_articles = articles[page_start:page_start + ARTICLES_PER_PAGE]
+    
     # Display articles as clickable list
-    for i, article in enumerate(articles):
-        title = article.get('title', 'Sin título')
-        summary = article.get('summary', '')
-        group_size = article.get('group_size', 1)
+    for i, article in enumerate(page_articles, start=page_start):
+        title = article.title or 'Sin título'
+        summary = article.summary
+        group_size = article.group_size
         
         # Icon based on group size
         icon = "📰" if group_size == 1 else f"📊 ({group_size} fuentes)"
@@ -184,11 +215,11 @@ if 'synthesized_articles' in st.session_state:
                 st.markdown("---")
             
             # Display article content with markdown
-            st.markdown(article.get('content', ''))
+            st.markdown(article.content)
             
             # Show sources if multiple
             if group_size > 1:
                 st.markdown("---")
                 st.markdown("**Fuentes:**")
-                for url in article.get('source_urls', []):
+                for url in article.source_urls:
                     st.markdown(f"- {url}")
\ No newline at end of file
@@ -3,56 +3,176 @@ Servicio para extraer contenido de artículos.
 Extrae títulos y texto principal de URLs para análisis semántico.
 """
 
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List, Mapping, Tuple
 import requests
-from bs4 import BeautifulSoup
+import aiohttp
+from bs4 import BeautifulSoup, Tag
+from bs4.dammit import EncodingDetector
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import asyncio
+import hashlib
 import logging
+import multiprocessing
+import os
 import re
+import threading
+import weakref
 
-logger = logging.getLogger(__name__)
+from utils.cache_utils import LRUCache, SQLiteCache
+from utils.http_utils import HEADERS, create_http_session
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-}
+logger = logging.getLogger(__name__)
 
 REQUEST_TIMEOUT = 15
 MAX_CONTENT_LENGTH = 8000  # Aumentado para OpenAI
+MAX_RESPONSE_BYTES = 131_072  # Solo se leen los primeros 128 KB de HTML (head + primeros párrafos)
+MAX_EXTRACTION_WORKERS = 16
+ARTICLE_CACHE_PATH = "./.cache/articles.sqlite"
+MEMORY_CACHE_SIZE = 2048
+
+BOILERPLATE_KEYWORDS = (
+    'cookies', 'política de privacidad', 'aviso legal', 'todos los derechos',
+    'copyright', 'términos y condiciones', 'suscríbete', 'newsletter',
+    'síguenos en', 'compartir en', 'redes sociales', 'política de cookies',
+    'aceptar cookies', 'cerrar', 'más información', 'leer más tarde',
+    'publicidad', 'patrocinado', 'anuncio', 'comparte este artículo'
+)
+
+# Patrones compilados una sola vez (hot path: se usan en cada artículo)
+_WS_RE = re.compile(r'\s+')
+_NL_RE = re.compile(r'\n\s*\n')
+_CONTAINER_CLASS_RE = re.compile(r'article|content|post|entry|body', re.I)
+_BOILERPLATE_RE = re.compile('|'.join(map(re.escape, BOILERPLATE_KEYWORDS)))
+_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+
+MAX_BODY_PARAGRAPHS = 4
+
+# Los procesos de parseo no se crean con fork: el servidor de Streamlit tiene muchos hilos
+# y un fork puede heredar locks tomados y bloquear a los hijos
+_PARSE_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Contenedores típicos de artículos, en orden de prioridad (body como último recurso)
+_BODY_CONTAINER_LOOKUPS = (
+    ('article', {}),
+    ('div', {'class_': _CONTAINER_CLASS_RE}),
+    ('main', {}),
+    ('div', {'attrs': {'role': 'main'}}),
+    ('body', {}),
+)
 
 
 class ArticleContentExtractor:
     """Extrae contenido relevante de artículos para análisis semántico."""
     
-    def __init__(self, timeout: int = REQUEST_TIMEOUT):
+    def __init__(
+        self,
+        timeout: int = REQUEST_TIMEOUT,
+        cache_path: Optional[str] = ARTICLE_CACHE_PATH,
+        parse_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            timeout: Timeout de cada request en segundos
+            cache_path: Fichero SQLite para cachear contenidos entre ejecuciones (None = sin disco)
+            parse_workers: Procesos para parsear HTML en lote (None = os.cpu_count())
+        """
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        # Pool keep-alive + compresión + reintentos: reutiliza TCP+TLS entre artículos del mismo host
+        self.session = create_http_session()
+        
+        # Cache en memoria (misma sesión) + cache en disco revalidada con ETag/Last-Modified
+        self.memory_cache = LRUCache(maxsize=MEMORY_CACHE_SIZE)
+        self.disk_cache = SQLiteCache(cache_path) if cache_path else None
+        
+        # Pool de parseo de larga duración: se crea al primer uso y se reutiliza entre
+        # llamadas (arrancar procesos en cada lote cuesta más que parsear unas pocas páginas)
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._parse_pool_finalizer: Optional[weakref.finalize] = None
+        self._parse_pool_lock = threading.Lock()
+    
+    @property
+    def parse_pool(self) -> ProcessPoolExecutor:
+        """Pool de procesos compartido para parsear HTML (creado de forma perezosa)."""
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=_PARSE_MP_CONTEXT
+                )
+                # Si el extractor se descarta sin shutdown() (p.ej. al expulsarlo de
+                # st.cache_resource) los procesos se liberan al recolectarlo
+                self._parse_pool_finalizer = weakref.finalize(
+                    self, self._parse_pool.shutdown, wait=False, cancel_futures=True
+                )
+            return self._parse_pool
+    
+    def shutdown(self) -> None:
+        """Libera el pool de parseo y la sesión HTTP."""
+        with self._parse_pool_lock:
+            if self._parse_pool is not None:
+                self._parse_pool_finalizer.detach()
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+                self._parse_pool_finalizer = None
+        self.session.close()
     
-    def _clean_text(self, text: str) -> str:
+    @staticmethod
+    def _cache_key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+    
+    def _get_cached_entry(self, url: str) -> Optional[Dict[str, str]]:
+        """Devuelve la entrada en disco {etag, last_modified, content} de una URL."""
+        if not self.disk_cache:
+            return None
+        return self.disk_cache.get(self._cache_key(url))
+    
+    @staticmethod
+    def _conditional_headers(entry: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """Construye cabeceras If-None-Match / If-Modified-Since a partir de la cache."""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def _store_cached_entry(self, url: str, response_headers, content: str) -> None:
+        """Guarda el contenido en disco si la respuesta permite revalidarlo."""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        
+        if self.disk_cache and content and (etag or last_modified):
+            self.disk_cache.set(self._cache_key(url), {
+                'etag': etag,
+                'last_modified': last_modified,
+                'content': content,
+            })
+    
+    @staticmethod
+    def _clean_text(text: str) -> str:
         """Limpia texto removiendo caracteres extraños y espacios múltiples."""
         # Normalizar espacios en blanco
-        text = re.sub(r'\s+', ' ', text)
+        text = _WS_RE.sub(' ', text)
         # Remover líneas vacías múltiples
-        text = re.sub(r'\n\s*\n', '\n', text)
+        text = _NL_RE.sub('\n', text)
         return text.strip()
     
-    def _is_boilerplate(self, text: str) -> bool:
+    @staticmethod
+    def _is_boilerplate(text: str) -> bool:
         """Detecta si un texto es boilerplate (footer, legal, cookies, etc)."""
-        text_lower = text.lower()
-        boilerplate_keywords = [
-            'cookies', 'política de privacidad', 'aviso legal', 'todos los derechos',
-            'copyright', 'términos y condiciones', 'suscríbete', 'newsletter',
-            'síguenos en', 'compartir en', 'redes sociales', 'política de cookies',
-            'aceptar cookies', 'cerrar', 'más información', 'leer más tarde',
-            'publicidad', 'patrocinado', 'anuncio', 'comparte este artículo'
-        ]
-        
-        # Si el texto es muy corto y contiene keywords de boilerplate
-        if len(text) < 100:
-            return any(keyword in text_lower for keyword in boilerplate_keywords)
-        
-        return False
-    
-    def _extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
+        # Solo los textos muy cortos pueden ser boilerplate: salir antes de normalizar
+        if len(text) >= 100:
+            return False
+        
+        # Un único escaneo del texto contra todas las keywords
+        return _BOILERPLATE_RE.search(text.lower()) is not None
+    
+    @staticmethod
+    def _extract_metadata(soup: BeautifulSoup) -> Dict[str, str]:
         """Extrae metadata relevante (description, keywords, author)."""
         metadata = {}
         
@@ -75,48 +195,61 @@ class ArticleContentExtractor:
         
         return metadata
     
-    def _extract_article_body(self, soup: BeautifulSoup) -> List[str]:
+    @staticmethod
+    def _iter_containers(soup: BeautifulSoup) -> Iterator[Tag]:
+        """Recorre los contenedores candidatos del artículo en orden de prioridad (sin repetir)."""
+        seen = set()
+        for name, kwargs in _BODY_CONTAINER_LOOKUPS:
+            container = soup.find(name, **kwargs)
+            if container is not None and id(container) not in seen:
+                seen.add(id(container))
+                yield container
+    
+    @classmethod
+    def _iter_paragraphs(cls, container: Tag) -> Iterator[str]:
+        """Genera (de forma perezosa) los párrafos de calidad de un contenedor."""
+        for node in container.descendants:
+            if getattr(node, 'name', None) != 'p':
+                continue
+            
+            text = node.get_text(strip=True)
+            
+            # Filtros de calidad
+            if (text and 
+                len(text) > 40 and  # Mínimo 40 caracteres
+                not cls._is_boilerplate(text) and
+                not text.startswith('http')):  # No es una URL
+                
+                yield text
+    
+    @classmethod
+    def _extract_article_body(cls, soup: BeautifulSoup) -> List[str]:
         """
         Extrae el cuerpo del artículo de forma inteligente.
         Busca contenedores típicos de artículos y extrae párrafos relevantes.
-        """
-        paragraphs = []
-        
-        # Buscar contenedores comunes de artículos
-        article_containers = [
-            soup.find('article'),
-            soup.find('div', class_=re.compile(r'article|content|post|entry|body', re.I)),
-            soup.find('main'),
-            soup.find('div', attrs={'role': 'main'}),
-        ]
-        
-        # Usar el primer contenedor válido
-        container = None
-        for c in article_containers:
-            if c:
-                container = c
-                break
         
-        # Si no hay contenedor, usar todo el body
-        if not container:
-            container = soup.find('body')
+        Usa el primer contenedor que aporte MAX_BODY_PARAGRAPHS párrafos sustanciales
+        (o, si ninguno llega, el que más aporte) y deja de recorrer el DOM en cuanto
+        los tiene.
         
-        if not container:
-            return paragraphs
+        Returns:
+            Hasta MAX_BODY_PARAGRAPHS párrafos, cada uno limitado a 400 caracteres
+        """
+        best = []
         
-        # Extraer todos los párrafos del contenedor
-        for p in container.find_all('p'):
-            text = p.get_text(strip=True)
+        for container in cls._iter_containers(soup):
+            selected = []
+            for text in cls._iter_paragraphs(container):
+                # Párrafos más largos tienen más información
+                if len(text) > 60:
+                    selected.append(text[:400])  # Limitar cada párrafo
+                    if len(selected) >= MAX_BODY_PARAGRAPHS:
+                        return selected
             
-            # Filtros de calidad
-            if (text and 
-                len(text) > 40 and  # Mínimo 40 caracteres
-                not self._is_boilerplate(text) and
-                not text.startswith('http')):  # No es una URL
-                
-                paragraphs.append(text)
+            if len(selected) > len(best):
+                best = selected
         
-        return paragraphs
+        return best
     
     def extract_content(self, url: str) -> str:
         """
@@ -136,94 +269,342 @@ class ArticleContentExtractor:
             Texto limpio optimizado para embeddings semánticos
         """
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            content, html, response_headers = self._fetch(url)
+            if content is None:
+                content = self._parse(html, url)
+            
+            return self._remember(url, content, response_headers)
+        
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return ""
+        except Exception as e:
+            logger.error(f"Unexpected error extracting content from {url}: {e}")
+            return ""
+    
+    def _fetch(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[Mapping[str, str]]]:
+        """
+        Descarga el HTML de un artículo respetando las caches.
+        
+        Returns:
+            Tuple of (content, html, response_headers)
+            - content: Contenido ya extraído si viene de cache o si la respuesta no es HTML
+              (no hace falta parsear)
+            - html: HTML descargado y decodificado (None si content no es None)
+            - response_headers: Cabeceras de la respuesta descargada
+        """
+        content = self.memory_cache.get(url)
+        if content is not None:
+            return content, None, None
+        
+        entry = self._get_cached_entry(url)
+        
+        with self.session.get(
+            url,
+            timeout=self.timeout,
+            headers=self._conditional_headers(entry),
+            stream=True
+        ) as response:
+            if response.status_code == 304 and entry:
+                logger.debug(f"No modificado (304): {url}")
+                return entry['content'], None, None
+            
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Remover ruido completo
-            for tag in soup([
-                "script", "style", "nav", "header", "footer", "aside", 
-                "noscript", "iframe", "form", "button", "input"
-            ]):
-                tag.decompose()
-            
-            content_parts = []
-            
-            # 1. Metadata
-            metadata = self._extract_metadata(soup)
-            
-            # Meta description primero (suele ser el mejor resumen)
-            if 'description' in metadata:
-                content_parts.append(f"Resumen: {metadata['description']}")
-            
-            # 2. Título H1
-            h1 = soup.find('h1')
-            if h1:
-                h1_text = self._clean_text(h1.get_text())
-                if h1_text and len(h1_text) > 5:
-                    content_parts.append(f"Título: {h1_text}")
-            
-            # 3. Subtítulo H2 (opcional)
-            h2 = soup.find('h2')
-            if h2:
-                h2_text = self._clean_text(h2.get_text())
-                if h2_text and len(h2_text) > 5:
-                    content_parts.append(f"Subtítulo: {h2_text}")
-            
-            # 4. Cuerpo del artículo (primeros 3-5 párrafos de calidad)
-            paragraphs = self._extract_article_body(soup)
-            
-            # Tomar los primeros 4 párrafos más sustanciales
-            selected_paragraphs = []
-            for p in paragraphs:
-                if len(selected_paragraphs) >= 4:
-                    break
-                # Párrafos más largos tienen más información
-                if len(p) > 60:
-                    selected_paragraphs.append(p[:400])  # Limitar cada párrafo
+            content_type = response.headers.get('Content-Type', '')
+            if not self._is_html(content_type):
+                logger.debug(f"Ignorado (no es HTML: {content_type}): {url}")
+                return "", None, None
+            
+            raw = response.raw.read(MAX_RESPONSE_BYTES, decode_content=True)
+            return None, self._decode_html(raw, content_type), response.headers
+    
+    @staticmethod
+    def _is_html(content_type: str) -> bool:
+        """Indica si el Content-Type corresponde a HTML (sin cabecera se asume que sí)."""
+        content_type = content_type.lower()
+        return not content_type or content_type.startswith(('text/html', 'application/xhtml'))
+    
+    @staticmethod
+    def _decode_html(raw: bytes, content_type: str) -> str:
+        """
+        Decodifica el HTML con el charset de la cabecera o, si no lo declara, con el
+        del <meta charset> / http-equiv del documento (utf-8 por defecto).
+        
+        Evita la detección de encoding byte a byte (chardet) y tolera el último
+        carácter multibyte cortado por MAX_RESPONSE_BYTES.
+        """
+        match = _CHARSET_RE.search(content_type)
+        if match:
+            encoding = match.group(1)
+        else:
+            # Muchos periódicos locales solo declaran el charset (latin-1/windows-1252) en el HTML
+            encoding = EncodingDetector.find_declared_encoding(raw, is_html=True) or 'utf-8'
+        try:
+            return raw.decode(encoding, errors='replace')
+        except LookupError:
+            return raw.decode('utf-8', errors='replace')
+    
+    def _remember(self, url: str, content: str, response_headers: Optional[Mapping[str, str]] = None) -> str:
+        """Guarda el contenido extraído en las caches y lo devuelve."""
+        if response_headers is not None:
+            self._store_cached_entry(url, response_headers, content)
+        if content:
+            self.memory_cache.set(url, content)
+        return content
+    
+    @classmethod
+    def _parse(cls, markup: str, url: str) -> str:
+        """
+        Parsea el HTML de un artículo y construye el texto semántico.
+        
+        Es un classmethod (sin estado de instancia) para poder ejecutarse en un
+        ProcessPoolExecutor.
+        
+        Args:
+            markup: HTML del artículo
+            url: URL del artículo (solo para logging)
             
-            if selected_paragraphs:
-                content_parts.append("Contenido: " + " ".join(selected_paragraphs))
+        Returns:
+            Texto limpio optimizado para embeddings semánticos
+        """
+        soup = BeautifulSoup(markup, "lxml")
+        
+        # Remover ruido completo
+        for tag in soup([
+            "script", "style", "nav", "header", "footer", "aside", 
+            "noscript", "iframe", "form", "button", "input"
+        ]):
+            tag.decompose()
+        
+        content_parts = []
+        
+        # 1. Metadata
+        metadata = cls._extract_metadata(soup)
+        
+        # Meta description primero (suele ser el mejor resumen)
+        if 'description' in metadata:
+            content_parts.append(f"Resumen: {metadata['description']}")
+        
+        # 2. Título H1
+        h1 = soup.find('h1')
+        if h1:
+            h1_text = cls._clean_text(h1.get_text())
+            if h1_text and len(h1_text) > 5:
+                content_parts.append(f"Título: {h1_text}")
+        
+        # 3. Subtítulo H2 (opcional)
+        h2 = soup.find('h2')
+        if h2:
+            h2_text = cls._clean_text(h2.get_text())
+            if h2_text and len(h2_text) > 5:
+                content_parts.append(f"Subtítulo: {h2_text}")
+        
+        # 4. Cuerpo del artículo (primeros 4 párrafos más sustanciales)
+        selected_paragraphs = cls._extract_article_body(soup)
+        
+        if selected_paragraphs:
+            content_parts.append("Contenido: " + " ".join(selected_paragraphs))
+        
+        # 5. Keywords (contexto adicional)
+        if 'keywords' in metadata:
+            keywords = metadata['keywords'][:200]  # Limitar keywords
+            content_parts.append(f"Temas: {keywords}")
+        
+        # Combinar todo
+        full_content = ' '.join(content_parts)
+        full_content = cls._clean_text(full_content)
+        
+        # Limitar a 8000 chars (para OpenAI)
+        if len(full_content) > MAX_CONTENT_LENGTH:
+            full_content = full_content[:MAX_CONTENT_LENGTH]
+        
+        logger.debug(f"Extraído de {url}: {len(full_content)} chars")
+        return full_content
+    
+    def extract_multiple(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Extrae contenido de múltiples URLs.
+        
+        Args:
+            urls: Lista de URLs
+            
+        Returns:
+            Dict {url: contenido}
+        """
+        if not urls:
+            return {}
+        
+        contents = {}
+        parse_futures = {}
+        
+        # Descarga en hilos (requests libera el GIL durante el I/O) y parseo en procesos
+        # (BeautifulSoup retiene el GIL), para que ninguna etapa frene a la otra
+        parse_pool = self.parse_pool
+        with ThreadPoolExecutor(max_workers=min(MAX_EXTRACTION_WORKERS, len(urls))) as fetch_pool:
+            fetch_futures = {fetch_pool.submit(self._fetch, url): url for url in urls}
+            
+            for future in as_completed(fetch_futures):
+                url = fetch_futures[future]
+                try:
+                    content, html, response_headers = future.result()
+                except requests.RequestException as e:
+                    logger.error(f"Error fetching {url}: {e}")
+                    continue
+                except Exception as e:
+                    logger.error(f"Unexpected error extracting content from {url}: {e}")
+                    continue
+                
+                if content is not None:
+                    contents[url] = content
+                else:
+                    parse_future = parse_pool.submit(self._parse, html, url)
+                    parse_futures[parse_future] = (url, response_headers)
+            
+            for future in as_completed(parse_futures):
+                url, response_headers = parse_futures[future]
+                try:
+                    contents[url] = self._remember(url, future.result(), response_headers)
+                except Exception as e:
+                    logger.error(f"Unexpected error extracting content from {url}: {e}")
+        
+        # Mantener el orden original de las URLs
+        return {url: contents[url] for url in urls if contents.get(url)}
+
+
+class AsyncArticleContentExtractor(ArticleContentExtractor):
+    """Extrae contenido de muchas URLs en paralelo usando aiohttp."""
+    
+    def __init__(
+        self,
+        timeout: int = REQUEST_TIMEOUT,
+        cache_path: Optional[str] = ARTICLE_CACHE_PATH,
+        parse_workers: Optional[int] = None,
+        max_concurrent: int = 16
+    ):
+        super().__init__(timeout, cache_path, parse_workers)
+        self.max_concurrent = max_concurrent
+    
+    async def extract_content_async(
+        self,
+        url: str,
+        session: aiohttp.ClientSession,
+        parse_executor: Optional[Executor] = None
+    ) -> str:
+        """
+        Extrae contenido semántico de un artículo (versión async).
+        
+        El parseo se ejecuta en un executor para no bloquear el event loop.
+        
+        Args:
+            url: URL del artículo
+            session: Sesión aiohttp compartida
+            parse_executor: Executor para el parseo (None = executor por defecto del loop)
             
-            # 5. Keywords (contexto adicional)
-            if 'keywords' in metadata:
-                keywords = metadata['keywords'][:200]  # Limitar keywords
-                content_parts.append(f"Temas: {keywords}")
+        Returns:
+            Texto limpio optimizado para embeddings semánticos
+        """
+        content = self.memory_cache.get(url)
+        if content is not None:
+            return content
+        
+        try:
+            entry = self._get_cached_entry(url)
             
-            # Combinar todo
-            full_content = ' '.join(content_parts)
-            full_content = self._clean_text(full_content)
+            async with session.get(url, headers=self._conditional_headers(entry)) as response:
+                if response.status == 304 and entry:
+                    logger.debug(f"No modificado (304): {url}")
+                    return self._remember(url, entry['content'])
+                
+                response.raise_for_status()
+                
+                content_type = response.headers.get('Content-Type', '')
+                if not self._is_html(content_type):
+                    logger.debug(f"Ignorado (no es HTML: {content_type}): {url}")
+                    return ""
+                
+                raw = await self._read_capped(response)
+                response_headers = response.headers
             
-            # Limitar a 8000 chars (para OpenAI)
-            if len(full_content) > MAX_CONTENT_LENGTH:
-                full_content = full_content[:MAX_CONTENT_LENGTH]
+            html = self._decode_html(raw, content_type)
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(parse_executor, self._parse, html, url)
             
-            logger.debug(f"Extraído de {url}: {len(full_content)} chars")
-            return full_content
+            return self._remember(url, content, response_headers)
         
-        except requests.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.error(f"Error fetching {url}: {e}")
             return ""
         except Exception as e:
             logger.error(f"Unexpected error extracting content from {url}: {e}")
             return ""
     
-    def extract_multiple(self, urls: List[str]) -> Dict[str, str]:
+    @staticmethod
+    async def _read_capped(response: aiohttp.ClientResponse) -> bytes:
+        """Lee como máximo MAX_RESPONSE_BYTES del cuerpo de la respuesta."""
+        raw = bytearray()
+        async for chunk in response.content.iter_chunked(65536):
+            raw += chunk
+            if len(raw) >= MAX_RESPONSE_BYTES:
+                break
+        return bytes(raw[:MAX_RESPONSE_BYTES])
+    
+    def create_session(self) -> aiohttp.ClientSession:
+        """Crea la sesión aiohttp (keep-alive, límites por host). Debe usarse dentro del event loop."""
+        return aiohttp.ClientSession(
+            headers=HEADERS,
+            connector=aiohttp.TCPConnector(limit=32, limit_per_host=4, keepalive_timeout=30),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+    
+    async def extract_many_async(
+        self,
+        urls: List[str],
+        progress_callback=None
+    ) -> Dict[str, str]:
         """
-        Extrae contenido de múltiples URLs.
+        Extrae contenido de múltiples URLs en paralelo (hasta max_concurrent a la vez).
         
         Args:
             urls: Lista de URLs
+            progress_callback: Función para reportar progreso
             
         Returns:
-            Dict {url: contenido}
+            Dict {url: contenido} en el mismo orden que urls
         """
-        results = {}
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        contents = {}
         
-        for url in urls:
-            content = self.extract_content(url)
-            if content:
-                results[url] = content
+        parse_pool = self.parse_pool
         
-        return results
\ No newline at end of file
+        async with self.create_session() as session:
+            
+            async def extract_with_semaphore(url):
+                async with semaphore:
+                    return url, await self.extract_content_async(url, session, parse_pool)
+            
+            tasks = [extract_with_semaphore(url) for url in urls]
+            
+            for i, task in enumerate(asyncio.as_completed(tasks)):
+                url, content = await task
+                if content:
+                    contents[url] = content
+                
+                if progress_callback:
+                    progress_callback((i + 1) / len(urls))
+        
+        # Mantener el orden original de las URLs
+        return {url: contents[url] for url in urls if url in contents}
+    
+    def extract_many(self, urls: List[str], progress_callback=None) -> Dict[str, str]:
+        """
+        Extrae contenido de múltiples URLs en paralelo (wrapper sincrónico).
+        
+        Args:
+            urls: Lista de URLs
+            progress_callback: Función para reportar progreso
+            
+        Returns:
+            Dict {url: contenido}
+        """
+        return asyncio.run(self.extract_many_async(urls, progress_callback))
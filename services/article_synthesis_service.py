@@ -4,29 +4,202 @@ Usa GPT-4o-mini para crear un artículo comprehensivo con toda la información.
 Soporta síntesis paralela para mayor velocidad (hasta 10 requests concurrentes).
 """
 
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import logging
 from openai import OpenAI, AsyncOpenAI
 import asyncio
+import re
+
+from models.article import SynthesizedArticle
+from utils.cache_utils import LLMCache, SQLiteCache
 
 logger = logging.getLogger(__name__)
 
+SYNTHESIS_CACHE_PATH = "./.cache/synthesis.sqlite"
+
+# Primera línea "# Título" (H1, no "##") y línea con el marcador de resumen
+_H1_RE = re.compile(r'^[ \t]*#(?!#)(.*)$', re.M)
+_SUMMARY_RE = re.compile(r'\*\*(?:Resumen|Summary):\*\*[ \t]*(.+?)[ \t]*$', re.M)
+
+# Instrucciones, guía de estilo, formato de salida y ejemplo, idénticos byte a byte en
+# todas las llamadas. OpenAI solo cachea prefijos idénticos de al menos 1024 tokens: este
+# prompt de sistema se mantiene por encima de ese umbral para que todas las síntesis
+# (de cualquier grupo) reutilicen el prefijo cacheado. Las fuentes de cada grupo (la
+# parte dinámica) van al final, en el mensaje del usuario.
+SYNTHESIS_SYSTEM_PROMPT = """Eres un periodista profesional experto en crear artículos. \
+Tu tarea es crear UN artículo unificado y completo a partir de múltiples \
+fuentes que hablan del mismo tema. Debes:
+1. Combinar toda la información relevante
+2. Eliminar redundancias
+3. Mantener todos los datos importantes (fechas, nombres, cifras)
+4. Escribir de forma clara y profesional
+5. Usar formato markdown para estructura (títulos, subtítulos, listas, etc)
+6. NO inventar información que no esté en las fuentes
+7. NO abusar de las listas
+
+Recibirás varios artículos de diferentes fuentes que hablan sobre el mismo tema.
+
+Tu tarea es crear UN artículo unificado que:
+1. Tenga un título claro y descriptivo
+2. Incluya TODA la información relevante de todas las fuentes
+3. Esté bien estructurado con secciones si es necesario
+4. Sea fácil de leer y comprensible
+5. Mantenga todos los datos importantes (fechas, nombres, cifras, etc)
+
+GUÍA DE ESTILO
+
+Contexto: las fuentes son medios locales y la web del Ayuntamiento de Boadilla del Monte \
+(Madrid). Los lectores son vecinos del municipio: conocen sus barrios, calles y \
+equipamientos, así que no hace falta explicar qué es Boadilla, pero sí cualquier \
+concepto administrativo poco conocido (por ejemplo, qué supone una modificación puntual \
+del plan general o una licitación por procedimiento abierto).
+
+Registro y tono:
+- Escribe en español de España, en tercera persona y con un tono informativo y neutral.
+- Evita adjetivos valorativos ("magnífico", "polémico", "histórico") salvo que aparezcan \
+entre comillas y atribuidos a alguien en las fuentes.
+- No uses primera persona, preguntas retóricas ni llamadas a la acción ("¡no te lo pierdas!").
+- Prefiere frases cortas y párrafos de tres a cinco frases.
+- Empieza por lo más importante: qué ha pasado, quién, cuándo y dónde. Los antecedentes y \
+el contexto van después.
+
+Datos y cifras:
+- Conserva exactamente las cifras, importes, porcentajes, horarios y fechas de las fuentes.
+- Escribe las fechas como "9 de enero de 2026" y las horas como "18:30 horas".
+- Escribe los importes como "1,2 millones de euros" o "45.000 euros".
+- Si una cifra solo aparece en una fuente, inclúyela igualmente.
+- Si dos fuentes dan cifras distintas para el mismo dato, menciona ambas y a quién se \
+atribuye cada una (por ejemplo: "según el Ayuntamiento", "según la asociación vecinal").
+
+Nombres y atribución:
+- Cita a las personas con nombre y cargo la primera vez (por ejemplo, "la concejala de \
+Cultura, [nombre y apellido]") y solo con el apellido o el cargo después.
+- Atribuye siempre las declaraciones y las valoraciones; las citas literales van entre \
+comillas y sin modificar.
+- No atribuyas a una fuente algo que no dice ni mezcles declaraciones de personas distintas.
+- No menciones los medios de origen ni expresiones como "según la fuente 2": el lector \
+debe leer un único artículo coherente.
+
+Qué omitir:
+- Información que no esté en las fuentes, aunque parezca probable o de conocimiento general.
+- Texto de navegación, avisos de cookies, llamadas a suscribirse o a compartir en redes.
+- Repeticiones: si varias fuentes cuentan lo mismo, dilo una sola vez con el detalle más completo.
+
+Tipos de noticia habituales:
+- Obras y urbanismo: indica la ubicación exacta, el plazo de ejecución, el presupuesto, la \
+empresa adjudicataria si se menciona y las afecciones al tráfico o al aparcamiento.
+- Plenos y acuerdos municipales: explica qué se ha aprobado, con qué votos de cada grupo \
+y qué cambia para los vecinos; resume las posturas de los grupos sin tomar partido.
+- Cultura, deporte y fiestas: destaca fechas, horarios, lugar, precio de las entradas y \
+forma de inscripción; si hay programación de varios días, ordénala cronológicamente.
+- Servicios sociales, ayudas y trámites: detalla requisitos, plazos, cuantías y dónde \
+se presenta la solicitud (sede electrónica, oficina de atención al ciudadano, etc).
+- Sucesos y seguridad: limítate a los hechos confirmados, no especules sobre causas ni \
+responsables y respeta la presunción de inocencia.
+- Educación y sanidad: cita el centro, el nivel educativo o el servicio afectado y el \
+calendario previsto.
+
+REGLAS DE FORMATO
+
+- La PRIMERA línea de la respuesta debe ser el título, precedido de "# " (un único \
+almohadilla y un espacio). No escribas nada antes del título.
+- El título tiene entre 6 y 14 palabras, sin punto final y sin comillas, y resume el hecho \
+principal.
+- Las secciones usan "## " y tienen subtítulos informativos (nunca "Introducción" ni \
+"Desarrollo"). Usa entre dos y cuatro secciones según la cantidad de información.
+- Usa listas solo para enumeraciones reales (horarios, requisitos, calles afectadas), \
+nunca para narrar hechos.
+- Usa **negrita** con moderación, solo para datos clave como fechas límite o direcciones.
+- No incluyas enlaces, imágenes, tablas ni bloques de código.
+- Termina siempre con la sección "## Conclusión", de uno o dos párrafos, que resuma el \
+alcance del hecho y, si las fuentes lo indican, los próximos pasos.
+
+Formato de salida (IMPORTANTE - usa exactamente este formato):
+
+# [TÍTULO DEL ARTÍCULO]
+
+## [Subtítulo 1]
+
+[Contenido del subtítulo 1]
+
+## [Subtítulo 2]
+
+[Contenido del subtítulo 2]
+
+## Conclusión
+
+[Conclusión del artículo]
+
+EJEMPLO (solo ilustra el estilo y el formato; no copies sus datos)
+
+Fuentes de ejemplo:
+- Fuente A: "El Ayuntamiento abrirá el 15 de marzo la nueva biblioteca del barrio de \
+Valenoso, con 1.200 metros cuadrados y 40 puestos de estudio. La obra ha costado \
+2,1 millones de euros."
+- Fuente B: "La biblioteca de Valenoso abrirá sus puertas el 15 de marzo. Tendrá horario \
+de 9:00 a 21:00 horas de lunes a sábado. La asociación vecinal cifra el coste en \
+2,4 millones de euros."
+
+Artículo de ejemplo:
+
+# La nueva biblioteca de Valenoso abrirá el 15 de marzo con 40 puestos de estudio
+
+## Un equipamiento de 1.200 metros cuadrados
+
+El barrio de Valenoso contará a partir del **15 de marzo** con una nueva biblioteca \
+municipal de 1.200 metros cuadrados y 40 puestos de estudio. El centro abrirá de lunes a \
+sábado, de 9:00 a 21:00 horas.
+
+## Coste de la obra
+
+Según el Ayuntamiento, la obra ha costado 2,1 millones de euros, mientras que la \
+asociación vecinal eleva la cifra a 2,4 millones de euros.
+
+## Conclusión
+
+La apertura amplía la oferta de espacios de estudio del municipio, aunque el coste final \
+de la obra difiere según quién lo calcule.
+
+---
+
+Recuerda: combina la información sin inventar nada nuevo. Si hay contradicciones entre fuentes, menciónalas."""
+
 
 class ArticleSynthesisService:
     """Sintetiza múltiples artículos duplicados en uno solo usando GPT-4o-mini con paralelización."""
     
-    def __init__(self, openai_api_key: str, max_concurrent: int = 10):
+    def __init__(
+        self,
+        openai_api_key: str,
+        max_concurrent: int = 10,
+        cache: Optional[LLMCache] = None
+    ):
+        """
+        Args:
+            openai_api_key: API key de OpenAI
+            max_concurrent: Máximo de requests simultáneas a OpenAI
+            cache: Cache de respuestas (None = SQLite en SYNTHESIS_CACHE_PATH)
+        """
         self.client = OpenAI(api_key=openai_api_key)
         self.async_client = AsyncOpenAI(api_key=openai_api_key)
         self.model = "gpt-4o-mini"
         self.max_concurrent = max_concurrent
+        self.cache = cache or LLMCache(SQLiteCache(SYNTHESIS_CACHE_PATH))
     
-    async def synthesize_article_async(self, articles_content: List[str]) -> Dict[str, str]:
+    async def synthesize_article_async(
+        self,
+        articles_content: List[str],
+        title_callback: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, str]:
         """
         Sintetiza múltiples artículos en uno solo (versión async).
         
+        La respuesta se recibe en streaming: en cuanto llega la línea del título
+        se notifica a title_callback, antes de que termine el cuerpo.
+        
         Args:
             articles_content: Lista de contenidos de artículos que hablan de lo mismo
+            title_callback: Función que recibe el título en cuanto se genera
             
         Returns:
             Dict con title, content, summary
@@ -43,36 +216,52 @@ class ArticleSynthesisService:
             return self._extract_from_single_article(articles_content[0])
         
         # Preparar prompt
-        prompt = self._build_synthesis_prompt(articles_content)
+        messages = [
+            {
+                "role": "system",
+                "content": SYNTHESIS_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": self._build_synthesis_prompt(articles_content)
+            }
+        ]
+        
+        # Mismas fuentes y mismo prompt -> se reutiliza la síntesis anterior
+        cached = self.cache.get(self.model, messages)
+        if cached is not None:
+            logger.debug("Síntesis recuperada de cache")
+            return cached
         
         try:
-            response = await self.async_client.chat.completions.create(
+            stream = await self.async_client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Eres un periodista profesional experto en crear artículos. "
-                            "Tu tarea es crear UN artículo unificado y completo a partir de múltiples "
-                            "fuentes que hablan del mismo tema. Debes:\n"
-                            "1. Combinar toda la información relevante\n"
-                            "2. Eliminar redundancias\n"
-                            "3. Mantener todos los datos importantes (fechas, nombres, cifras)\n"
-                            "4. Escribir de forma clara y profesional\n"
-                            "5. Usar formato markdown para estructura (títulos, subtítulos, listas, etc)\n"
-                            "6. NO inventar información que no esté en las fuentes\n"
-                            "7. NO abusar de las listas"
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=messages,
+                stream=True,
             )
             
-            article_text = response.choices[0].message.content
-            return self._parse_generated_article(article_text)
+            parts = []
+            title_pending = title_callback is not None
+            
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                
+                parts.append(delta)
+                
+                # El título está completo cuando su línea termina en salto de línea
+                if title_pending and '\n' in delta:
+                    partial = ''.join(parts)
+                    h1 = _H1_RE.search(partial)
+                    if h1 and h1.end() < len(partial):
+                        title_callback(h1.group(1).replace('#', '').strip())
+                        title_pending = False
+            
+            article_text = ''.join(parts)
+            article = self._parse_generated_article(article_text)
+            self.cache.set(self.model, messages, article)
+            return article
         
         except Exception as e:
             logger.error(f"Error sintetizando artículo: {e}")
@@ -83,7 +272,7 @@ class ArticleSynthesisService:
             }
     
     def _build_synthesis_prompt(self, articles_content: List[str]) -> str:
-        """Construye el prompt para sintetizar artículos."""
+        """Construye la parte dinámica del prompt: las fuentes del grupo."""
         sources_text = "\n\n---\n\n".join([
             f"**FUENTE {i+1}:**\n{content}" 
             for i, content in enumerate(articles_content)
@@ -91,36 +280,7 @@ class ArticleSynthesisService:
         
         return f"""Tienes {len(articles_content)} artículos de diferentes fuentes que hablan sobre el mismo tema.
 
-{sources_text}
-
----
-
-Tu tarea es crear UN artículo unificado que:
-1. Tenga un título claro y descriptivo
-2. Incluya TODA la información relevante de todas las fuentes
-3. Esté bien estructurado con secciones si es necesario
-4. Sea fácil de leer y comprensible
-5. Mantenga todos los datos importantes (fechas, nombres, cifras, etc)
-
-Formato de salida (IMPORTANTE - usa exactamente este formato):
-
-# [TÍTULO DEL ARTÍCULO]
-
-## [Subtítulo 1]
-
-[Contenido del subtítulo 1]
-
-## [Subtítulo 2]
-
-[Contenido del subtítulo 2]
-
-## Conclusión
-
-[Conclusión del artículo]
-
----
-
-Recuerda: combina la información sin inventar nada nuevo. Si hay contradicciones entre fuentes, menciónalas."""
+{sources_text}"""
     
     def _extract_from_single_article(self, content: str) -> Dict[str, str]:
         """Extrae título y contenido de un artículo único."""
@@ -141,23 +301,16 @@ Recuerda: combina la información sin inventar nada nuevo. Si hay contradiccione
     
     def _parse_generated_article(self, article_text: str) -> Dict[str, str]:
         """Parsea el artículo generado para extraer título, resumen y contenido."""
-        lines = article_text.split('\n')
-        
         title = "Artículo Sintetizado"
-        summary = ""
         content = article_text
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line.startswith('#') and not line.startswith('##'):
-                title = line.replace('#', '').strip()
-                content = '\n'.join(lines[i+1:]).strip()
-                break
+        h1 = _H1_RE.search(article_text)
+        if h1:
+            title = h1.group(1).replace('#', '').strip()
+            content = article_text[h1.end():].strip()
         
-        for line in lines:
-            if '**Resumen:**' in line or '**Summary:**' in line:
-                summary = line.split('**', 2)[-1].strip()
-                break
+        summary_match = _SUMMARY_RE.search(article_text)
+        summary = summary_match.group(1) if summary_match else ""
         
         return {
             "title": title[:200],
@@ -168,8 +321,9 @@ Recuerda: combina la información sin inventar nada nuevo. Si hay contradiccione
     async def _synthesize_group_async(
         self,
         group: List[str],
-        url_to_content: Dict[str, str]
-    ) -> Dict[str, str]:
+        url_to_content: Dict[str, str],
+        title_callback: Optional[Callable[[str], None]] = None
+    ) -> Optional[SynthesizedArticle]:
         """Sintetiza un grupo de artículos (versión async)."""
         if len(group) > 1:
             articles_content = [
@@ -181,18 +335,14 @@ Recuerda: combina la información sin inventar nada nuevo. Si hay contradiccione
             articles_content = [c for c in articles_content if c]
             
             if articles_content:
-                article = await self.synthesize_article_async(articles_content)
-                article['group_size'] = len(group)
-                article['source_urls'] = group
-                return article
+                article = await self.synthesize_article_async(articles_content, title_callback)
+                return SynthesizedArticle(**article, group_size=len(group), source_urls=group)
         else:
             url = group[0]
             content = url_to_content.get(url, "")
             if content:
                 article = self._extract_from_single_article(content)
-                article['group_size'] = 1
-                article['source_urls'] = group
-                return article
+                return SynthesizedArticle(**article, group_size=1, source_urls=group)
         
         return None
     
@@ -201,7 +351,7 @@ Recuerda: combina la información sin inventar nada nuevo. Si hay contradiccione
         groups: List[List[str]], 
         url_to_content: Dict[str, str],
         progress_callback=None
-    ) -> List[Dict[str, str]]:
+    ) -> List[SynthesizedArticle]:
         """
         Sintetiza todos los grupos en paralelo (hasta 10 requests concurrentes).
         
@@ -216,12 +366,30 @@ Recuerda: combina la información sin inventar nada nuevo. Si hay contradiccione
         # Semáforo para limitar concurrencia a 10
         semaphore = asyncio.Semaphore(self.max_concurrent)
         
+        # Un grupo cuenta medio cuando llega su título y entero cuando termina
+        progress = {'completed': 0, 'titled': 0}
+        
+        def report():
+            if progress_callback:
+                progress_callback((progress['completed'] + 0.5 * progress['titled']) / len(groups))
+        
         async def process_group_with_semaphore(i, group):
             async with semaphore:
-                article = await self._synthesize_group_async(group, url_to_content)
+                titled = False
+                
+                def on_title(title):
+                    nonlocal titled
+                    titled = True
+                    progress['titled'] += 1
+                    logger.debug(f"Título generado para el grupo {i + 1}: {title}")
+                    report()
+                
+                article = await self._synthesize_group_async(group, url_to_content, on_title)
                 
-                if progress_callback:
-                    progress_callback((i + 1) / len(groups))
+                if titled:
+                    progress['titled'] -= 1
+                progress['completed'] += 1
+                report()
                 
                 return article
         
@@ -244,7 +412,7 @@ Recuerda: combina la información sin inventar nada nuevo. Si hay contradiccione
         groups: List[List[str]], 
         url_to_content: Dict[str, str],
         progress_callback=None
-    ) -> List[Dict[str, str]]:
+    ) -> List[SynthesizedArticle]:
         """
         Sintetiza todos los grupos (wrapper sincrónico).
         Ejecuta hasta 10 requests a OpenAI en paralelo.
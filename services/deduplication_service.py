@@ -3,36 +3,91 @@ Servicio de deduplicación de noticias usando clustering jerárquico híbrido.
 Combina BM25 (similitud léxica) + embeddings OpenAI (similitud semántica).
 """
 
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+import asyncio
+import hashlib
 import logging
 import numpy as np
-from openai import OpenAI
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import umap
+import tiktoken
+from openai import OpenAI, AsyncOpenAI
 from scipy.cluster.hierarchy import linkage, fcluster
-from scipy.spatial.distance import squareform
-import re
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.neighbors import NearestNeighbors
+
+from utils.cache_utils import SQLiteCache
+
+try:
+    import simsimd  # Opcional: similitud SIMD sobre embeddings int8
+except ImportError:
+    simsimd = None
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_MAX_CONCURRENT = 4
+EMBEDDING_MAX_TOKENS = 8000  # Límite del modelo: 8191 tokens por entrada
+EMBEDDING_FALLBACK_ENCODING = "cl100k_base"
+EMBEDDING_CACHE_PATH = "./.cache/embeddings.sqlite"
+
+# Parámetros estándar de BM25 (los mismos que usa rank_bm25 por defecto)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# A partir de este tamaño se agrupa sobre un grafo k-NN disperso en vez de la matriz completa
+KNN_CLUSTERING_MIN_SIZE = 200
+KNN_NEIGHBORS = 20
+
+# Dominios problemáticos (estructura similar pero contenido diferente): para pares del
+# mismo dominio se usa 60% BM25 / 40% semántico
+PROBLEMATIC_DOMAINS = ('boadilladigital.es', 'soydemadrid.com')
+PROBLEMATIC_BM25_WEIGHT = 0.6
+
+PairScores = Callable[[int, int], Tuple[float, float, float]]
+
+# Tabla para str.translate: puntuación -> espacio (equivale a re.sub(r'[^\w\s]', ' ')
+# en Latin-1, más la puntuación Unicode habitual en prensa española)
+_PUNCT_TABLE = {
+    i: ' ' for i in range(256)
+    if not chr(i).isalnum() and not chr(i).isspace() and chr(i) != '_'
+}
+_PUNCT_TABLE.update({ord(c): ' ' for c in '«»…—–“”‘’•·€'})
+
 
 class DeduplicationService:
     """Servicio para detectar y agrupar artículos duplicados usando clustering híbrido."""
     
-    def __init__(self, similarity_threshold: float = 0.85, bm25_weight: float = 0.3, openai_api_key: str = None):
+    def __init__(
+        self,
+        similarity_threshold: float = 0.85,
+        bm25_weight: float = 0.3,
+        openai_api_key: str = None,
+        embedding_cache_path: Optional[str] = EMBEDDING_CACHE_PATH
+    ):
         """
         Args:
             similarity_threshold: Umbral de similitud combinada (0.0 a 1.0)
             bm25_weight: Peso de BM25 vs embeddings (0.3 = 30% BM25, 70% embeddings)
             openai_api_key: API key de OpenAI
+            embedding_cache_path: Fichero SQLite de la cache de embeddings (None = sin cache)
         """
         self.similarity_threshold = similarity_threshold
         self.bm25_weight = bm25_weight
+        self.embedding_cache = SQLiteCache(embedding_cache_path) if embedding_cache_path else None
+        
+        # Tokenizer del modelo de embeddings, para truncar por tokens y no por caracteres
+        try:
+            self._encoding = tiktoken.encoding_for_model(EMBEDDING_MODEL)
+        except KeyError:
+            # Versiones de tiktoken que no conocen el modelo: los text-embedding-3 usan cl100k_base
+            self._encoding = tiktoken.get_encoding(EMBEDDING_FALLBACK_ENCODING)
         
         if openai_api_key:
             logger.info("Inicializando cliente OpenAI...")
             self.client = OpenAI(api_key=openai_api_key)
+            self.async_client = AsyncOpenAI(api_key=openai_api_key)
             logger.info("Cliente OpenAI listo ✓")
         else:
             raise ValueError("Se requiere openai_api_key")
@@ -44,65 +99,383 @@ class DeduplicationService:
     
     def _preprocess_text(self, text: str) -> str:
         """Preprocesa texto para BM25: lowercase y tokens."""
-        text = text.lower()
         # Mantener palabras importantes
-        text = re.sub(r'[^\w\s]', ' ', text)
-        return text
+        return text.lower().translate(_PUNCT_TABLE)
+    
+    def _build_bm25(self, texts: List[str]) -> Tuple[csr_matrix, csr_matrix]:
+        """
+        Preprocesa y tokeniza una sola vez y construye el índice BM25 del lote como dos
+        matrices dispersas (documentos x términos):
+        
+        - tf: frecuencia de cada término en cada documento (también hace de consulta)
+        - weights: aportación BM25 de cada término a cada documento,
+          idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        
+        así la puntuación de la consulta q contra el documento d es tf[q] · weights[d] y
+        todas las puntuaciones salen de un único producto disperso.
+        
+        Se usa la IDF de BM25+ (log((N+1)/df), siempre positiva): la de Okapi se anula
+        en lotes pequeños (con 4 documentos o menos todas las puntuaciones salen 0).
+        Los términos ausentes no suman (BM25+ con delta=0).
+        """
+        vocabulary = {}
+        indices, indptr = [], [0]
+        for text in texts:
+            indices.extend(
+                vocabulary.setdefault(token, len(vocabulary))
+                for token in self._preprocess_text(text).split()
+            )
+            indptr.append(len(indices))
+        
+        n = len(texts)
+        doc_len = np.diff(indptr)
+        tf = csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(n, len(vocabulary))
+        )
+        tf.sum_duplicates()
+        
+        doc_freq = np.bincount(tf.indices, minlength=len(vocabulary))
+        idf = np.log((n + 1) / np.maximum(doc_freq, 1))
+        avgdl = doc_len.mean() if n and doc_len.sum() else 1.0
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avgdl)
+        
+        weights = tf.copy()
+        nnz_rows = np.repeat(np.arange(n), np.diff(tf.indptr))
+        weights.data = idf[tf.indices] * tf.data * (BM25_K1 + 1) / (tf.data + length_norm[nnz_rows])
+        
+        return tf, weights
     
     def _compute_bm25_similarity(self, texts: List[str]) -> np.ndarray:
         """
         Calcula similitud BM25 entre textos.
         
         Returns:
-            Matriz de similitud BM25 (n_samples, n_samples)
+            Matriz de similitud BM25 (n_samples, n_samples) con unos en la diagonal
         """
-        # Preprocesar textos
-        processed_texts = [self._preprocess_text(t) for t in texts]
-        
-        # TF-IDF como aproximación de BM25
-        vectorizer = TfidfVectorizer(
-            max_features=500,
-            ngram_range=(1, 2),  # Unigrams y bigrams
-            min_df=1,
-            max_df=0.8
-        )
+        tf, weights = self._build_bm25(texts)
+        
+        # Puntuación BM25 de cada documento usado como consulta contra todos los demás
+        scores = (tf @ weights.T).toarray()
         
-        tfidf_matrix = vectorizer.fit_transform(processed_texts)
-        bm25_similarity = cosine_similarity(tfidf_matrix)
+        # Simetrizar y normalizar por la auto-puntuación de cada documento -> [0, 1]
+        scores = (scores + scores.T) / 2
+        # Un documento sin tokens tiene auto-puntuación 0: se evita dividir por cero
+        self_scores = np.clip(np.diag(scores), 1e-12, None)
+        bm25_similarity = np.clip(scores / np.sqrt(np.outer(self_scores, self_scores)), 0, 1)
+        np.fill_diagonal(bm25_similarity, 1.0)
         
         return bm25_similarity
     
+    @staticmethod
+    def _bm25_pair_similarity(
+        tf: csr_matrix,
+        weights: csr_matrix,
+        rows: Sequence[int],
+        cols: Sequence[int]
+    ) -> np.ndarray:
+        """
+        Similitud BM25 normalizada (igual que _compute_bm25_similarity) solo para los
+        pares (rows[p], cols[p]), con productos fila a fila sobre las matrices dispersas.
+        """
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        
+        def directed(queries, docs):
+            return np.asarray(tf[queries].multiply(weights[docs]).sum(axis=1)).ravel()
+        
+        self_scores = np.clip(np.asarray(tf.multiply(weights).sum(axis=1)).ravel(), 1e-12, None)
+        pair_scores = (directed(rows, cols) + directed(cols, rows)) / 2
+        
+        return np.clip(pair_scores / np.sqrt(self_scores[rows] * self_scores[cols]), 0, 1)
+    
+    def _truncate_tokens(self, text: str) -> str:
+        """Trunca el texto a EMBEDDING_MAX_TOKENS tokens (límite de OpenAI por entrada)."""
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) <= EMBEDDING_MAX_TOKENS:
+            return text
+        return self._encoding.decode(tokens[:EMBEDDING_MAX_TOKENS])
+    
+    def _embedding_key(self, text: str) -> str:
+        """Clave de cache: modelo + hash del texto (ya truncado) que se envía a OpenAI."""
+        return hashlib.sha256(f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")).hexdigest()
+    
+    async def _get_openai_embeddings_async(
+        self,
+        texts: List[str],
+        client: Optional[AsyncOpenAI] = None
+    ) -> np.ndarray:
+        """
+        Obtiene embeddings de OpenAI en lotes concurrentes (versión async).
+        
+        Los textos ya embebidos en ejecuciones anteriores se leen de la cache en disco;
+        solo los nuevos o modificados se envían a la API.
+        
+        Args:
+            texts: Textos a embeber
+            client: Cliente async a usar (None = self.async_client)
+            
+        Returns:
+            Array float32 de embeddings normalizados (n_samples, embedding_dim)
+        """
+        truncated_texts = [self._truncate_tokens(text) for text in texts]
+        keys = [self._embedding_key(text) for text in truncated_texts]
+        
+        embeddings = [
+            self.embedding_cache.get(key) if self.embedding_cache else None
+            for key in keys
+        ]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if missing:
+            logger.info(
+                f"Solicitando embeddings a OpenAI para {len(missing)} textos "
+                f"({len(texts) - len(missing)} en cache)..."
+            )
+            fresh = await self._request_embeddings(
+                [truncated_texts[i] for i in missing],
+                client or self.async_client
+            )
+            
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+            
+            if self.embedding_cache:
+                self.embedding_cache.set_many((keys[i], embeddings[i]) for i in missing)
+        else:
+            logger.info(f"Embeddings de {len(texts)} textos recuperados de cache")
+        
+        embeddings = np.vstack(embeddings).astype(np.float32, copy=False)
+        logger.info(f"Embeddings listos: shape {embeddings.shape}")
+        return embeddings
+    
+    @staticmethod
+    async def _request_embeddings(texts: List[str], client: AsyncOpenAI) -> np.ndarray:
+        """Pide a OpenAI los embeddings de texts y los devuelve normalizados (float32)."""
+        # Un POST por cada EMBEDDING_BATCH_SIZE textos, hasta EMBEDDING_MAX_CONCURRENT a la vez
+        semaphore = asyncio.Semaphore(EMBEDDING_MAX_CONCURRENT)
+        
+        async def embed_batch(batch):
+            async with semaphore:
+                response = await client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=batch
+                )
+                return [item.embedding for item in response.data]
+        
+        batches = await asyncio.gather(*[
+            embed_batch(texts[start:start + EMBEDDING_BATCH_SIZE])
+            for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+        ])
+        
+        # gather conserva el orden de los lotes
+        embeddings = np.asarray(
+            [embedding for batch in batches for embedding in batch],
+            dtype=np.float32
+        )
+        
+        # Normalizar una vez: la similitud coseno queda como un único producto matricial
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1, norms)
+        return embeddings
+    
     def _get_openai_embeddings(self, texts: List[str]) -> np.ndarray:
         """
-        Obtiene embeddings de OpenAI en batch.
+        Obtiene embeddings de OpenAI en batch (wrapper sincrónico).
+        
+        Usa un cliente async propio: el de self.async_client queda ligado al event
+        loop del pipeline y asyncio.run crea uno nuevo en cada llamada.
+        
+        Returns:
+            Array float32 de embeddings normalizados (n_samples, embedding_dim)
+        """
+        async def run():
+            async with AsyncOpenAI(api_key=self.client.api_key) as client:
+                return await self._get_openai_embeddings_async(texts, client)
+        
+        return asyncio.run(run())
+    
+    def _resolve_embeddings(
+        self,
+        urls: List[str],
+        contents: List[str],
+        precomputed: Dict[str, np.ndarray]
+    ) -> np.ndarray:
+        """Combina embeddings precalculados con los que falten, en el orden de urls."""
+        missing = [i for i, url in enumerate(urls) if url not in precomputed]
+        if missing:
+            fresh = self._get_openai_embeddings([contents[i] for i in missing])
+            precomputed = {**precomputed, **dict(zip((urls[i] for i in missing), fresh))}
+        
+        return np.vstack([precomputed[url] for url in urls]).astype(np.float32, copy=False)
+    
+    async def embed_texts_async(self, texts: List[str]) -> np.ndarray:
+        """
+        Calcula embeddings normalizados para textos sueltos sin bloquear el event loop
+        (p.ej. desde un pipeline), para pasarlos después a
+        group_similar_articles(precomputed_embeddings=...).
+        
+        Returns:
+            Array float32 de embeddings normalizados (n_samples, embedding_dim)
+        """
+        return await self._get_openai_embeddings_async(texts)
+    
+    @staticmethod
+    def _compute_semantic_similarity(embeddings: np.ndarray) -> np.ndarray:
+        """
+        Calcula la similitud coseno entre embeddings normalizados.
+        
+        Si simsimd está instalado, cuantiza cada fila a int8 (escala simétrica por fila)
+        y calcula la matriz con kernels SIMD; si no, usa el producto matricial FP32.
         
         Returns:
-            Array de embeddings (n_samples, embedding_dim)
+            Matriz de similitud semántica (n_samples, n_samples)
+        """
+        if simsimd is None:
+            return embeddings @ embeddings.T
+        
+        max_abs = np.max(np.abs(embeddings), axis=1, keepdims=True)
+        scale = 127 / np.where(max_abs == 0, 1, max_abs)
+        quantized = np.round(embeddings * scale).astype(np.int8)
+        
+        # El coseno es invariante a la escala de cada fila: no hace falta reescalar
+        distances = np.asarray(simsimd.cdist(quantized, quantized, metric="cosine"), dtype=np.float32)
+        return 1 - distances
+    
+    def _pair_weights(self, domains: np.ndarray, problematic_mask: np.ndarray, rows, cols) -> np.ndarray:
+        """Peso BM25 de cada par: PROBLEMATIC_BM25_WEIGHT si comparten dominio problemático."""
+        same_problematic_domain = (domains[rows] == domains[cols]) & problematic_mask[rows]
+        return np.where(same_problematic_domain, PROBLEMATIC_BM25_WEIGHT, self.bm25_weight)
+    
+    def _cluster_dense(
+        self,
+        contents: List[str],
+        embeddings: np.ndarray,
+        domains: np.ndarray,
+        problematic_mask: np.ndarray
+    ) -> Tuple[np.ndarray, PairScores]:
         """
-        logger.info(f"Solicitando embeddings a OpenAI para {len(texts)} textos...")
+        Clustering jerárquico (average linkage) sobre todas las distancias por pares.
+        
+        Returns:
+            Tuple of (cluster_labels, pair_scores) donde pair_scores(i, j) devuelve
+            (semántica, BM25, híbrida) del par
+        """
+        semantic_similarity = self._compute_semantic_similarity(embeddings)
+        
+        logger.info("Calculando similitud BM25...")
+        bm25_similarity = self._compute_bm25_similarity(contents)
+        
+        # Las matrices son simétricas: solo se calcula el triángulo superior (i < j),
+        # fila a fila, directamente en el formato condensado que usa scipy
+        n = len(contents)
+        hybrid_similarity = np.empty(n * (n - 1) // 2)
+        
+        offset = 0
+        for i in range(n - 1):
+            weights = self._pair_weights(domains, problematic_mask, i, slice(i + 1, None))
+            
+            row = slice(offset, offset + n - i - 1)
+            hybrid_similarity[row] = (
+                weights * bm25_similarity[i, i + 1:]
+                + (1.0 - weights) * semantic_similarity[i, i + 1:]
+            )
+            offset = row.stop
+        
+        # Convertir a distancia (formato condensado)
+        condensed_distances = np.clip(1 - hybrid_similarity, 0, 2)
         
-        # Truncar textos si son muy largos (OpenAI tiene límite de ~8000 tokens)
-        truncated_texts = [text[:8000] for text in texts]
+        # Clustering jerárquico
+        logger.info(f"Aplicando clustering jerárquico (threshold={1-self.similarity_threshold:.2f})...")
+        linkage_matrix = linkage(condensed_distances, method='average')
+        
+        # Cortar el dendrograma
+        distance_threshold = 1 - self.similarity_threshold
+        cluster_labels = fcluster(linkage_matrix, distance_threshold, criterion='distance')
+        
+        def pair_scores(i, j):
+            return (
+                semantic_similarity[i, j],
+                bm25_similarity[i, j],
+                hybrid_similarity[self._condensed_index(n, i, j)]
+            )
         
-        # Llamada a la API de OpenAI
-        response = self.client.embeddings.create(
-            model="text-embedding-3-small",
-            input=truncated_texts
+        return cluster_labels, pair_scores
+    
+    def _cluster_knn(
+        self,
+        contents: List[str],
+        embeddings: np.ndarray,
+        domains: np.ndarray,
+        problematic_mask: np.ndarray
+    ) -> Tuple[np.ndarray, PairScores]:
+        """
+        Agrupa por componentes conexas de un grafo k-NN disperso: solo se puntúan los
+        KNN_NEIGHBORS vecinos semánticos de cada artículo y se unen los pares cuya
+        similitud híbrida supera el umbral. La búsqueda de vecinos con métrica coseno es
+        por fuerza bruta (tiempo O(n²) productos escalares, calculados por bloques), pero
+        la memoria y la puntuación BM25/híbrida son O(n·k) en vez de O(n²).
+        
+        Returns:
+            Tuple of (cluster_labels, pair_scores) como en _cluster_dense
+        """
+        n = len(contents)
+        k = min(KNN_NEIGHBORS, n - 1)
+        logger.info(f"Construyendo grafo k-NN (k={k}) para {n} artículos...")
+        
+        nn = NearestNeighbors(n_neighbors=k + 1, metric='cosine').fit(embeddings)
+        _, neighbors = nn.kneighbors(embeddings)
+        
+        # Pares candidatos únicos (i < j)
+        rows = np.repeat(np.arange(n), k + 1)
+        cols = neighbors.ravel()
+        not_self = rows != cols
+        pairs = np.unique(np.sort(np.column_stack([rows[not_self], cols[not_self]]), axis=1), axis=0)
+        rows, cols = pairs[:, 0], pairs[:, 1]
+        
+        logger.info(f"Calculando similitud BM25 de {len(rows)} pares candidatos...")
+        tf, weights = self._build_bm25(contents)
+        
+        # Embeddings normalizados: el coseno es el producto escalar de cada par
+        semantic = np.einsum('ij,ij->i', embeddings[rows], embeddings[cols])
+        lexical = self._bm25_pair_similarity(tf, weights, rows, cols)
+        weights = self._pair_weights(domains, problematic_mask, rows, cols)
+        hybrid = weights * lexical + (1.0 - weights) * semantic
+        
+        # Aristas: pares por encima del umbral de similitud
+        edges = hybrid >= self.similarity_threshold
+        graph = csr_matrix(
+            (np.ones(int(edges.sum())), (rows[edges], cols[edges])),
+            shape=(n, n)
         )
+        _, cluster_labels = connected_components(graph, directed=False)
         
-        # Extraer embeddings
-        embeddings = np.array([item.embedding for item in response.data])
+        def pair_scores(i, j):
+            sem_score = float(embeddings[i] @ embeddings[j])
+            bm25_score = float(self._bm25_pair_similarity(tf, weights, [i], [j])[0])
+            weight = float(self._pair_weights(domains, problematic_mask, i, j))
+            return sem_score, bm25_score, weight * bm25_score + (1.0 - weight) * sem_score
         
-        logger.info(f"Embeddings recibidos: shape {embeddings.shape}")
-        return embeddings
+        return cluster_labels, pair_scores
+    
+    @staticmethod
+    def _condensed_index(n: int, i: int, j: int) -> int:
+        """Posición del par (i, j), i != j, en una matriz condensada de n elementos."""
+        i, j = min(i, j), max(i, j)
+        return n * i - i * (i + 1) // 2 + (j - i - 1)
     
-    def group_similar_articles(self, url_contents: Dict[str, str]) -> List[List[str]]:
+    def group_similar_articles(
+        self,
+        url_contents: Dict[str, str],
+        precomputed_embeddings: Optional[Dict[str, np.ndarray]] = None
+    ) -> List[List[str]]:
         """
         Agrupa URLs de artículos similares usando clustering jerárquico híbrido.
         Combina BM25 (léxico) + embeddings OpenAI (semántico).
         
         Args:
             url_contents: Dict {url: contenido_texto}
+            precomputed_embeddings: Dict {url: embedding} ya calculados (se piden a
+                OpenAI solo los que falten)
             
         Returns:
             Lista de grupos, donde cada grupo es una lista de URLs similares
@@ -122,61 +495,25 @@ class DeduplicationService:
         
         urls = [pair[0] for pair in valid_pairs]
         contents = [pair[1] for pair in valid_pairs]
+        url_to_idx = {url: idx for idx, url in enumerate(urls)}
         
-        # 1. Generar embeddings con OpenAI
-        embeddings = self._get_openai_embeddings(contents)
-        semantic_similarity = cosine_similarity(embeddings)
-        
-        # 2. Calcular similitud BM25 (léxica)
-        logger.info(f"Calculando similitud BM25...")
-        bm25_similarity = self._compute_bm25_similarity(contents)
-        
-        # 3. Ajustar peso BM25 adaptativamente
-        # Para pares del mismo dominio problemático, aumentar peso BM25
-        from urllib.parse import urlparse
-        domains = [urlparse(url).netloc for url in urls]
-        
-        # Dominios problemáticos (estructura similar pero contenido diferente)
-        problematic_domains = {'boadilladigital.es', 'soydemadrid.com'}
-        
-        # Crear matriz de pesos adaptativos
-        adaptive_weights = np.full((len(urls), len(urls)), self.bm25_weight)
-        
-        for i in range(len(urls)):
-            for j in range(i + 1, len(urls)):
-                if domains[i] == domains[j] and domains[i] in problematic_domains:
-                    # Aumentar peso BM25 para artículos del mismo dominio problemático
-                    adaptive_weights[i, j] = 0.6  # 60% BM25, 40% semántico
-                    adaptive_weights[j, i] = 0.6
-        
-        # 4. Combinar similitudes con pesos adaptativos
-        logger.info(f"Combinando similitudes (BM25: {self.bm25_weight:.0%} base, adaptativo para dominios problemáticos)...")
-        hybrid_similarity = np.zeros_like(semantic_similarity)
-        
-        for i in range(len(urls)):
-            for j in range(len(urls)):
-                w = adaptive_weights[i, j]
-                hybrid_similarity[i, j] = w * bm25_similarity[i, j] + (1 - w) * semantic_similarity[i, j]
+        # 1. Generar embeddings con OpenAI (reutilizando los ya calculados)
+        embeddings = self._resolve_embeddings(urls, contents, precomputed_embeddings or {})
         
         # Guardar embeddings para visualización
         self.last_embeddings = embeddings
         self.last_urls = urls
         
-        # Convertir a distancia
-        distance_matrix = 1 - hybrid_similarity
-        np.fill_diagonal(distance_matrix, 0)
-        distance_matrix = np.clip(distance_matrix, 0, 2)
-        
-        # Convertir a formato condensado para scipy
-        condensed_distances = squareform(distance_matrix, checks=False)
+        # 2. Preparar pesos BM25 adaptativos por dominio
+        domains = np.array([urlparse(url).netloc for url in urls])
+        problematic_mask = np.isin(domains, PROBLEMATIC_DOMAINS)
         
-        # Clustering jerárquico
-        logger.info(f"Aplicando clustering jerárquico (threshold={1-self.similarity_threshold:.2f})...")
-        linkage_matrix = linkage(condensed_distances, method='average')
-        
-        # Cortar el dendrograma
-        distance_threshold = 1 - self.similarity_threshold
-        cluster_labels = fcluster(linkage_matrix, distance_threshold, criterion='distance')
+        # 3. Combinar similitudes y agrupar
+        logger.info(f"Combinando similitudes (BM25: {self.bm25_weight:.0%} base, adaptativo para dominios problemáticos)...")
+        if len(urls) >= KNN_CLUSTERING_MIN_SIZE:
+            cluster_labels, pair_scores = self._cluster_knn(contents, embeddings, domains, problematic_mask)
+        else:
+            cluster_labels, pair_scores = self._cluster_dense(contents, embeddings, domains, problematic_mask)
         
         # Agrupar URLs por cluster
         clusters = {}
@@ -208,49 +545,62 @@ class DeduplicationService:
         for i, group in enumerate(multi_article_groups[:3]):
             logger.info(f"Grupo {i+1} ({len(group)} artículos):")
             for j, url1 in enumerate(group[:2]):
-                idx1 = urls.index(url1)
+                idx1 = url_to_idx[url1]
                 logger.info(f"  - {contents[idx1][:80]}...")
                 if j < len(group) - 1:
                     url2 = group[j + 1]
-                    idx2 = urls.index(url2)
-                    sem_score = semantic_similarity[idx1, idx2]
-                    bm25_score = bm25_similarity[idx1, idx2]
-                    hybrid_score = hybrid_similarity[idx1, idx2]
+                    idx2 = url_to_idx[url2]
+                    sem_score, bm25_score, hybrid_score = pair_scores(idx1, idx2)
                     logger.info(f"    vs próximo: Sem={sem_score:.3f}, BM25={bm25_score:.3f}, Híbrido={hybrid_score:.3f}")
         
         return groups
     
-    def get_umap_visualization_data(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    def get_umap_visualization_data(self, method: str = 'umap') -> Tuple[np.ndarray, np.ndarray, List[str]]:
         """
-        Genera datos para visualización UMAP 2D.
+        Genera datos para visualización 2D de los embeddings.
         
-        UMAP preserva mejor la estructura local y global que PCA.
+        UMAP preserva mejor la estructura local y global que PCA, pero importa numba y
+        compila en la primera llamada (varios segundos); por eso se importa solo aquí.
+        method='pca' usa TruncatedSVD, que responde en milisegundos.
+        
+        Args:
+            method: 'umap' o 'pca'
         
         Returns:
-            Tuple of (umap_coords, cluster_labels, urls)
-            - umap_coords: Array (n_samples, 2) con coordenadas 2D
+            Tuple of (coords, cluster_labels, urls)
+            - coords: Array (n_samples, 2) con coordenadas 2D
             - cluster_labels: Array (n_samples,) con labels de cluster
             - urls: Lista de URLs correspondientes
         """
         if self.last_embeddings is None:
             raise ValueError("Debes ejecutar group_similar_articles() primero")
         
-        # Aplicar UMAP para reducir a 2D
-        logger.info("Aplicando UMAP para reducción dimensional...")
-        
-        reducer = umap.UMAP(
-            n_components=2,
-            n_neighbors=15,  # Balance entre estructura local y global
-            min_dist=0.1,    # Mínima distancia entre puntos
-            metric='cosine', # Métrica apropiada para embeddings
-            random_state=42
-        )
-        
-        umap_coords = reducer.fit_transform(self.last_embeddings)
+        if method == 'pca':
+            from sklearn.decomposition import TruncatedSVD
+            
+            logger.info("Aplicando TruncatedSVD para reducción dimensional...")
+            coords = TruncatedSVD(n_components=2, random_state=42).fit_transform(self.last_embeddings)
+        elif method == 'umap':
+            import umap
+            
+            # Aplicar UMAP para reducir a 2D
+            logger.info("Aplicando UMAP para reducción dimensional...")
+            
+            reducer = umap.UMAP(
+                n_components=2,
+                n_neighbors=15,  # Balance entre estructura local y global
+                min_dist=0.1,    # Mínima distancia entre puntos
+                metric='cosine', # Métrica apropiada para embeddings
+                random_state=42
+            )
+            
+            coords = reducer.fit_transform(self.last_embeddings)
+        else:
+            raise ValueError(f"Método de visualización desconocido: {method}")
         
-        logger.info(f"UMAP completado: {umap_coords.shape}")
+        logger.info(f"Reducción {method} completada: {coords.shape}")
         
-        return umap_coords, self.last_cluster_labels, self.last_urls
+        return coords, self.last_cluster_labels, self.last_urls
     
     def get_statistics(self, groups: List[List[str]]) -> Dict:
         """Genera estadísticas de los grupos."""
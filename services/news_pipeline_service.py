@@ -0,0 +1,247 @@
+"""
+Pipeline de procesamiento de noticias.
+Encadena scraping → filtrado por fecha → extracción de contenido → embeddings como
+etapas asyncio conectadas por colas, de forma que cada etapa empieza a trabajar en
+cuanto la anterior produce el primer elemento (el parseo y los embeddings se solapan
+con la latencia de red).
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Sequence, Tuple
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+
+from models.article import ScrapedArticles
+from services.article_content_extractor import AsyncArticleContentExtractor
+from services.deduplication_service import DeduplicationService
+from services.scraper_service import NewsScraperService
+from utils.url_utils import canonicalize_url, group_urls_by_host, url_dedup_key
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 64
+EMBED_BATCH_SIZE = 64
+EMBED_IDLE_SECONDS = 2.0
+
+
+@dataclass(slots=True)
+class PipelineResult:
+    """Resultado acumulado del pipeline."""
+
+    articles: ScrapedArticles = field(default_factory=ScrapedArticles)
+    url_contents: Dict[str, str] = field(default_factory=dict)
+    embeddings: Dict[str, np.ndarray] = field(default_factory=dict)
+    total_scraped: int = 0
+    no_date_count: int = 0
+    old_date_count: int = 0
+
+
+def filter_recent_articles(
+    articles: ScrapedArticles,
+    days_threshold: int
+) -> Tuple[ScrapedArticles, int, int]:
+    """
+    Filtra artículos por fecha en una sola pasada vectorizada (fechas inválidas -> NaT).
+
+    Returns:
+        Tuple of (recent_articles, no_date_count, old_date_count)
+    """
+    if not articles:
+        return ScrapedArticles(), 0, 0
+
+    dates = pd.to_datetime(
+        pd.Series(articles.dates, dtype=object),
+        utc=True,
+        errors='coerce',
+        format='ISO8601'
+    )
+    cutoff_date = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=days_threshold)
+
+    missing = dates.isna().to_numpy()
+    recent = (dates >= cutoff_date).to_numpy()
+
+    return articles.take(recent), int(missing.sum()), int((~recent & ~missing).sum())
+
+
+class NewsPipelineService:
+    """Ejecuta scraping, extracción y embeddings como un pipeline asyncio con colas."""
+
+    def __init__(
+        self,
+        scraper: NewsScraperService,
+        extractor: AsyncArticleContentExtractor,
+        deduplicator: DeduplicationService,
+        days_threshold: int = 7
+    ):
+        self.scraper = scraper
+        self.extractor = extractor
+        self.deduplicator = deduplicator
+        self.days_threshold = days_threshold
+
+    async def run_async(
+        self,
+        sources: Sequence[str],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> PipelineResult:
+        """
+        Ejecuta el pipeline completo sobre las fuentes.
+
+        Etapas:
+        1. Productor: scrapea cada host (hosts en paralelo), filtra por fecha y encola URLs
+        2. Extractores: max_concurrent tareas que descargan y parsean cada URL
+        3. Embedder: agrupa contenidos en lotes de EMBED_BATCH_SIZE (o tras
+           EMBED_IDLE_SECONDS sin nuevos contenidos) y pide sus embeddings
+
+        Args:
+            sources: URLs de las fuentes a scrapear
+            progress_callback: Función que recibe los contadores de cada etapa
+
+        Returns:
+            PipelineResult con artículos, contenidos y embeddings por URL
+        """
+        result = PipelineResult()
+        url_queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        content_queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        queued_urls = []
+        seen_urls = set()
+        extracted = {}
+        n_workers = self.extractor.max_concurrent
+
+        pipeline_task = asyncio.current_task()
+        callback_error = None
+
+        def report():
+            # El callback no debe romper ninguna etapa: si falla (p.ej. StopException o
+            # RerunException de Streamlit, que heredan de BaseException) se guarda el error,
+            # se cancela el pipeline entero y se relanza al final
+            nonlocal callback_error
+            if not progress_callback or callback_error is not None:
+                return
+            try:
+                progress_callback({
+                    'scraped': result.total_scraped,
+                    'queued': len(queued_urls),
+                    'extracted': len(extracted),
+                    'embedded': len(result.embeddings),
+                })
+            except BaseException as e:
+                callback_error = e
+                pipeline_task.cancel()
+
+        async def scrape_host(host_urls, scrape_session):
+            for url in host_urls:
+                logger.info(f"Scraping: {url}")
+                articles = await self.scraper.scrape_site_async(url, scrape_session)
+
+                recent, no_date, old = filter_recent_articles(articles, self.days_threshold)
+                result.total_scraped += len(articles)
+                result.no_date_count += no_date
+                result.old_date_count += old
+
+                for raw_url, date in recent:
+                    key = url_dedup_key(raw_url)
+                    if key in seen_urls:
+                        continue
+
+                    seen_urls.add(key)
+                    article_url = canonicalize_url(raw_url)
+                    result.articles.append(article_url, date)
+                    queued_urls.append(article_url)
+                    await url_queue.put(article_url)
+
+                report()
+
+        async def produce(scrape_session):
+            async with asyncio.TaskGroup() as hosts:
+                for host_urls in group_urls_by_host(sources).values():
+                    hosts.create_task(scrape_host(host_urls, scrape_session))
+
+            # Solo se llega aquí si todos los hosts terminaron: los extractores siguen vivos
+            # (si uno muere, el TaskGroup cancela esta tarea y la cola no se queda esperando)
+            for _ in range(n_workers):
+                await url_queue.put(None)
+
+        async def extract_worker(session, parse_pool):
+            while (url := await url_queue.get()) is not None:
+                content = await self.extractor.extract_content_async(url, session, parse_pool)
+                if content:
+                    extracted[url] = content
+                    await content_queue.put((url, content))
+                report()
+
+        async def extract(session, parse_pool):
+            async with asyncio.TaskGroup() as workers:
+                for _ in range(n_workers):
+                    workers.create_task(extract_worker(session, parse_pool))
+
+            await content_queue.put(None)
+
+        async def embed(pending):
+            urls, texts = zip(*pending)
+            try:
+                vectors = await self.deduplicator.embed_texts_async(list(texts))
+                result.embeddings.update(zip(urls, vectors))
+            except Exception as e:
+                # Los que falten se recalculan al agrupar
+                logger.error(f"Error obteniendo embeddings en el pipeline: {e}")
+            pending.clear()
+            report()
+
+        async def embedder():
+            pending = []
+            while True:
+                # asyncio.timeout en vez de wait_for: wait_for puede tragarse una cancelación
+                # que llega justo cuando get() termina y el embedder no pararía nunca
+                try:
+                    async with asyncio.timeout(EMBED_IDLE_SECONDS):
+                        item = await content_queue.get()
+                except TimeoutError:
+                    if pending:
+                        await embed(pending)
+                    continue
+
+                if item is None:
+                    break
+
+                pending.append(item)
+                if len(pending) >= EMBED_BATCH_SIZE:
+                    await embed(pending)
+
+            if pending:
+                await embed(pending)
+
+        parse_pool = self.extractor.parse_pool
+
+        # Si una etapa falla, el TaskGroup cancela las demás (nadie queda bloqueado en una cola llena)
+        try:
+            async with self.scraper.create_session() as scrape_session, \
+                    self.extractor.create_session() as session, \
+                    asyncio.TaskGroup() as stages:
+                stages.create_task(produce(scrape_session))
+                stages.create_task(extract(session, parse_pool))
+                stages.create_task(embedder())
+        except asyncio.CancelledError:
+            if callback_error is None:
+                raise
+            pipeline_task.uncancel()
+            raise callback_error
+
+        # Mantener el orden en que se encolaron las URLs
+        result.url_contents = {url: extracted[url] for url in queued_urls if url in extracted}
+
+        logger.info(
+            f"Pipeline: {result.total_scraped} enlaces, {len(queued_urls)} recientes, "
+            f"{len(result.url_contents)} con contenido, {len(result.embeddings)} embeddings"
+        )
+        return result
+
+    def run(
+        self,
+        sources: Sequence[str],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> PipelineResult:
+        """Ejecuta el pipeline completo (wrapper sincrónico)."""
+        return asyncio.run(self.run_async(sources, progress_callback))
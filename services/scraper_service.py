@@ -3,35 +3,61 @@ News Scraper Service
 Servicio para extraer artículos de periódicos locales de Boadilla del Monte.
 """
 
-from typing import List, Set, Dict
+from typing import List, Optional
 from bs4 import BeautifulSoup
+import aiohttp
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from urllib.parse import urljoin, urlparse
 import logging
+import re
 
 from utils.dom_utils import prune_noise
-from utils.url_utils import is_valid_article_url, clean_url
+from utils.url_utils import canonicalize_url, clean_url, is_valid_article_url, url_dedup_key
 from utils.html_date_extractor import HTMLDateExtractor
+from utils.http_utils import HEADERS, create_http_session
+from models.article import ScrapedArticles
 
 logger = logging.getLogger(__name__)
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-}
-
 REQUEST_TIMEOUT = 15
+MAX_CONCURRENT_FETCHES = 10
+MAX_CONNECTIONS_PER_HOST = 2
+MAX_PARSE_WORKERS = 4
+
+# Heurísticas de _is_likely_article
+_ARTICLE_ANCESTORS = ["article", "h1", "h2", "h3", "h4"]
+_ARTICLE_CLASS_RE = re.compile(r"article|post|noticia|news|item|entry", re.I)
 
 
 class NewsScraperService:
     """Servicio para scraping de noticias."""
     
-    def __init__(self, timeout: int = REQUEST_TIMEOUT):
+    def __init__(self, timeout: int = REQUEST_TIMEOUT, parse_workers: int = MAX_PARSE_WORKERS):
+        """
+        Args:
+            timeout: Timeout de cada request en segundos
+            parse_workers: Hilos dedicados a parsear portadas (independientes de las descargas)
+        """
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+        self.session = create_http_session(pool_connections=16, pool_maxsize=MAX_CONNECTIONS_PER_HOST)
         self.date_extractor = HTMLDateExtractor()
-    
-    def scrape_site(self, url: str) -> List[Dict[str, str]]:
+        
+        # Pool propio para el parseo: la concurrencia de red (semáforo/conector aiohttp)
+        # y la de CPU se dimensionan por separado y ninguna deja sin hueco a la otra
+        self.parse_executor = ThreadPoolExecutor(
+            max_workers=parse_workers,
+            thread_name_prefix="scraper-parse"
+        )
+
+    def shutdown(self) -> None:
+        """Libera el pool de parseo y la sesión HTTP."""
+        self.parse_executor.shutdown()
+        self.session.close()
+
+    def scrape_site(self, url: str) -> ScrapedArticles:
         """
         Extrae artículos de una URL con sus fechas.
         
@@ -39,77 +65,158 @@ class NewsScraperService:
             url: URL del sitio a scrapear
             
         Returns:
-            Lista de dicts con {url, date}
+            ScrapedArticles con las URLs y sus fechas
         """
         try:
             response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, "html.parser")
-            prune_noise(soup)
-            
-            return self._extract_articles(soup, url)
+            return self._parse_listing(response.content, url)
         
         except requests.RequestException as e:
             logger.error(f"Error scraping {url}: {e}")
-            return []
+            return ScrapedArticles()
         except Exception as e:
             logger.error(f"Unexpected error scraping {url}: {e}")
-            return []
+            return ScrapedArticles()
+    
+    async def scrape_site_async(
+        self,
+        url: str,
+        session: aiohttp.ClientSession,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> ScrapedArticles:
+        """
+        Extrae artículos de una URL con sus fechas (versión async).
+        
+        El parseo se ejecuta en self.parse_executor para no bloquear el event loop.
+        
+        Args:
+            url: URL del sitio a scrapear
+            session: Sesión aiohttp compartida
+            semaphore: Limita las descargas simultáneas (None = sin límite)
+            
+        Returns:
+            ScrapedArticles con las URLs y sus fechas
+        """
+        try:
+            async with semaphore or contextlib.nullcontext():
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    html = await response.read()
+            
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.parse_executor, self._parse_listing, html, url)
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error scraping {url}: {e}")
+            return ScrapedArticles()
+        except Exception as e:
+            logger.error(f"Unexpected error scraping {url}: {e}")
+            return ScrapedArticles()
+    
+    def _parse_listing(self, html: bytes, url: str) -> ScrapedArticles:
+        """
+        Parsea la portada/listado y extrae sus artículos.
+        
+        Se pasan bytes para que lxml detecte la codificación (meta charset) en C.
+        """
+        soup = BeautifulSoup(html, "lxml")
+        prune_noise(soup)
+        
+        return self._extract_articles(soup, url)
+    
+    def create_session(self) -> aiohttp.ClientSession:
+        """Crea la sesión aiohttp (keep-alive, límites por host). Debe usarse dentro del event loop."""
+        return aiohttp.ClientSession(
+            headers=HEADERS,
+            connector=aiohttp.TCPConnector(
+                limit=MAX_CONCURRENT_FETCHES,
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=30
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
     
-    def scrape_multiple(self, urls: List[str]) -> List[Dict[str, str]]:
+    async def scrape_multiple_async(self, urls: List[str]) -> ScrapedArticles:
         """
-        Extrae artículos de múltiples URLs.
+        Extrae artículos de múltiples URLs en paralelo (hasta MAX_CONCURRENT_FETCHES a la vez).
         
         Args:
             urls: Lista de URLs a scrapear
             
         Returns:
-            Lista de dicts únicos con {url, date}
+            ScrapedArticles sin URLs repetidas
         """
-        all_articles = []
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        
+        async with self.create_session() as session:
+            results = await asyncio.gather(*[
+                self.scrape_site_async(url, session, semaphore) for url in urls
+            ])
+        
+        all_articles = ScrapedArticles()
         seen_urls = set()
         
-        for url in urls:
-            logger.info(f"Scraping: {url}")
-            articles = self.scrape_site(url)
-            
+        for url, articles in zip(urls, results):
             if articles:
-                logger.info(f"✅ Found {len(articles)} articles")
+                logger.info(f"✅ Found {len(articles)} articles in {url}")
                 
-                # Deduplicar por URL
-                for article in articles:
-                    if article['url'] not in seen_urls:
-                        all_articles.append(article)
-                        seen_urls.add(article['url'])
+                # Deduplicar por URL canónica (sin fragmento, tracking ni barra final)
+                for article_url, date in articles:
+                    key = url_dedup_key(article_url)
+                    if key not in seen_urls:
+                        all_articles.append(canonicalize_url(article_url), date)
+                        seen_urls.add(key)
             else:
                 logger.warning(f"❌ No articles found in {url}")
         
         return all_articles
     
-    def _extract_articles(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
+    def scrape_multiple(self, urls: List[str]) -> ScrapedArticles:
+        """
+        Extrae artículos de múltiples URLs en paralelo (wrapper sincrónico).
+        
+        Args:
+            urls: Lista de URLs a scrapear
+            
+        Returns:
+            ScrapedArticles sin URLs repetidas
+        """
+        return asyncio.run(self.scrape_multiple_async(urls))
+    
+    def _extract_articles(self, soup: BeautifulSoup, base_url: str) -> ScrapedArticles:
         """Extrae URLs de artículos con fechas del DOM."""
-        articles = []
+        articles = ScrapedArticles()
+        base_netloc = urlparse(base_url).netloc
+        date_cache = {}
         
         for a in soup.find_all("a", href=True):
-            if self._is_likely_article(a, base_url):
+            if self._is_likely_article(a, base_url, base_netloc):
                 full_url = urljoin(base_url, a["href"])
                 full_url = clean_url(full_url)
                 
                 if is_valid_article_url(full_url):
                     # Extraer fecha cercana al enlace
-                    date = self.date_extractor.extract_date_from_link(a, soup)
+                    date = self.date_extractor.extract_date_from_link(a, soup, date_cache)
                     
-                    articles.append({
-                        'url': full_url,
-                        'date': date
-                    })
+                    articles.append(full_url, date)
         
         return articles
     
     @staticmethod
-    def _is_likely_article(a_tag, base_domain: str) -> bool:
-        """Heurística para detectar si un enlace es un artículo."""
+    def _is_likely_article(a_tag, base_domain: str, base_netloc: Optional[str] = None) -> bool:
+        """
+        Heurística para detectar si un enlace es un artículo.
+        
+        Las comprobaciones baratas van primero: un texto con longitud típica de título
+        basta, así que los recorridos del árbol solo se hacen para el resto de enlaces.
+        
+        Args:
+            a_tag: Enlace a evaluar
+            base_domain: URL de la página que contiene el enlace
+            base_netloc: Dominio de base_domain ya calculado (None = se calcula aquí)
+        """
         href = a_tag.get("href", "").strip()
         if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
             return False
@@ -119,27 +226,24 @@ class NewsScraperService:
             return False
         
         full_url = urljoin(base_domain, href)
-        if urlparse(base_domain).netloc not in full_url:
+        if (base_netloc or urlparse(base_domain).netloc) not in full_url:
             return False
         
+        # Texto en rango típico de títulos
+        if 20 < len(text) < 200:
+            return True
+        
         parent = a_tag.parent
+        if not parent:
+            return False
         
         # Está en estructura de artículo
-        if parent and parent.find_parent(["article", "h1", "h2", "h3", "h4"]):
+        if parent.find_parent(_ARTICLE_ANCESTORS):
             return True
         
         # Tiene imagen cerca
-        if parent and parent.find("img"):
+        if parent.find("img"):
             return True
         
         # Tiene clase de artículo
-        parent_class = " ".join(parent.get("class", [])).lower() if parent else ""
-        article_keywords = ["article", "post", "noticia", "news", "item", "entry"]
-        if any(word in parent_class for word in article_keywords):
-            return True
-        
-        # Texto en rango típico de títulos
-        if 20 < len(text) < 200:
-            return True
-        
-        return False
\ No newline at end of file
+        return bool(_ARTICLE_CLASS_RE.search(" ".join(parent.get("class", []))))
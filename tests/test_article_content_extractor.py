@@ -0,0 +1,47 @@
+import asyncio
+
+from services.article_content_extractor import ArticleContentExtractor, AsyncArticleContentExtractor
+
+
+def test_extract_many_async_opens_session_and_parse_pool():
+    # El pool de parseo no es un context manager asíncrono: no debe usarse con "async with"
+    extractor = AsyncArticleContentExtractor(cache_path=None, parse_workers=1)
+    try:
+        assert asyncio.run(extractor.extract_many_async([])) == {}
+    finally:
+        extractor.shutdown()
+
+
+def test_decode_html_uses_meta_charset_when_header_has_none():
+    raw = (
+        '<html><head><meta charset="iso-8859-1"><title>Inauguración</title></head>'
+        '<body><h1>Inauguración del nuevo parque</h1></body></html>'
+    ).encode('latin-1')
+
+    html = ArticleContentExtractor._decode_html(raw, 'text/html')
+
+    assert 'Inauguración del nuevo parque' in html
+
+
+def test_decode_html_prefers_header_charset():
+    raw = '<meta charset="iso-8859-1"><p>Año nuevo</p>'.encode('utf-8')
+
+    assert 'Año nuevo' in ArticleContentExtractor._decode_html(raw, 'text/html; charset=utf-8')
+
+
+def test_parse_pool_is_reused_and_released():
+    extractor = ArticleContentExtractor(cache_path=None, parse_workers=1)
+    try:
+        pool = extractor.parse_pool
+        assert extractor.parse_pool is pool
+
+        content = pool.submit(
+            ArticleContentExtractor._parse,
+            '<html><body><h1>Nuevo parque en Boadilla</h1></body></html>',
+            'https://a.es/noticia-uno'
+        ).result()
+        assert 'Nuevo parque en Boadilla' in content
+    finally:
+        extractor.shutdown()
+
+    assert extractor._parse_pool is None
@@ -0,0 +1,17 @@
+import pytest
+import tiktoken
+
+from services.article_synthesis_service import SYNTHESIS_SYSTEM_PROMPT
+
+# OpenAI solo cachea prefijos de prompt idénticos de al menos 1024 tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+def test_system_prompt_is_long_enough_for_prompt_caching():
+    try:
+        encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception as e:  # El fichero BPE se descarga la primera vez
+        pytest.skip(f"Tokenizer de gpt-4o-mini no disponible: {e}")
+
+    assert len(encoding.encode(SYNTHESIS_SYSTEM_PROMPT)) >= PROMPT_CACHE_MIN_TOKENS
+
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from utils import date_utils
+from utils.date_utils import parse_date_flexible
+
+
+def test_parse_date_flexible_formats():
+    assert parse_date_flexible("2026-01-09T10:30:00") == "2026-01-09"
+    assert parse_date_flexible("Publicado el 9 de enero de 2026") == "2026-01-09"
+    assert parse_date_flexible("enero 9, 2026") == "2026-01-09"
+    assert parse_date_flexible("09/01/2026") == "2026-01-09"
+
+
+def test_parse_date_flexible_without_date():
+    assert parse_date_flexible("Leer más noticias de Boadilla") is None
+    assert parse_date_flexible("") is None
+
+
+def test_parse_date_flexible_prefers_pattern_priority_over_position():
+    # Con varias fechas gana el patrón más prioritario (ISO), aunque aparezca después
+    text = "Actualizado 12/05/2026 10:00 | Publicado 2026-05-10"
+
+    assert parse_date_flexible(text) == "2026-05-10"
+
+
+def test_parse_date_flexible_skips_invalid_higher_priority_match():
+    # La ISO está fuera del rango válido: se prueba el siguiente formato
+    assert parse_date_flexible("1999-01-01 / 10.05.2026") == "2026-05-10"
+
+
+def test_parse_date_flexible_cache_follows_current_bounds(monkeypatch):
+    assert parse_date_flexible("9 de enero de 2026") == "2026-01-09"
+
+    # Otro "ahora" (otros límites): el resultado memoizado no debe reutilizarse
+    monkeypatch.setattr(date_utils, "_get_bounds", lambda: (datetime(2032, 1, 1), datetime(2038, 12, 31)))
+
+    assert parse_date_flexible("9 de enero de 2026") is None
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from services import deduplication_service
+from services.deduplication_service import DeduplicationService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    # Sin red: el tokenizer solo se usa para truncar textos antes de pedir embeddings
+    monkeypatch.setattr(deduplication_service.tiktoken, "encoding_for_model", lambda model: None)
+    return DeduplicationService(
+        similarity_threshold=0.75,
+        openai_api_key="test",
+        embedding_cache_path=None
+    )
+
+
+def test_bm25_similarity_of_identical_small_documents(service):
+    text = "El ayuntamiento inaugura el nuevo polideportivo municipal"
+    similarity = service._compute_bm25_similarity([text, text])
+
+    np.testing.assert_allclose(similarity, np.ones((2, 2)))
+
+
+def test_bm25_similarity_has_unit_diagonal_for_empty_documents(service):
+    similarity = service._compute_bm25_similarity(["", "fiestas patronales de boadilla"])
+
+    np.testing.assert_allclose(np.diag(similarity), [1.0, 1.0])
+    assert similarity[0, 1] == 0.0
+
+
+def test_identical_articles_are_grouped(service):
+    text = "El ayuntamiento inaugura el nuevo polideportivo municipal"
+    embedding = np.ones(8, dtype=np.float32) / np.sqrt(8)
+    urls = ["https://a.es/noticia-uno", "https://b.es/noticia-dos"]
+
+    groups = service.group_similar_articles(
+        {url: text for url in urls},
+        precomputed_embeddings={url: embedding for url in urls}
+    )
+
+    assert groups == [urls]
+
+
+def test_unknown_embedding_model_falls_back_to_cl100k(monkeypatch):
+    def unknown_model(model):
+        raise KeyError(model)
+
+    fallback = object()
+    monkeypatch.setattr(deduplication_service.tiktoken, "encoding_for_model", unknown_model)
+    monkeypatch.setattr(
+        deduplication_service.tiktoken, "get_encoding",
+        lambda name: fallback if name == "cl100k_base" else None
+    )
+
+    service = DeduplicationService(openai_api_key="test", embedding_cache_path=None)
+
+    assert service._encoding is fallback
+
+
+def _corpus():
+    return [
+        "El ayuntamiento inaugura el nuevo polideportivo municipal de Boadilla",
+        "Boadilla inaugura su polideportivo: el alcalde visita las nuevas pistas",
+        "Las fiestas patronales llenan las calles de Boadilla del Monte",
+        "Cortes de tráfico en la avenida de España por obras de asfaltado",
+        "Nuevas pistas de pádel en el polideportivo municipal",
+        "",
+    ]
+
+
+def test_bm25_scores_match_rank_bm25(service):
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    texts = _corpus()
+    tokenized = [service._preprocess_text(t).split() for t in texts]
+    reference = rank_bm25.BM25Plus(tokenized, delta=0)
+
+    tf, weights = service._build_bm25(texts)
+    scores = (tf @ weights.T).toarray()
+
+    expected = np.vstack([reference.get_scores(query) for query in tokenized])
+    np.testing.assert_allclose(scores, expected, atol=1e-9)
+
+
+def test_bm25_pair_similarity_matches_dense_matrix(service):
+    texts = _corpus()
+    dense = service._compute_bm25_similarity(texts)
+    tf, weights = service._build_bm25(texts)
+    rows, cols = np.triu_indices(len(texts), k=1)
+
+    pairs = service._bm25_pair_similarity(tf, weights, rows, cols)
+
+    np.testing.assert_allclose(pairs, dense[rows, cols], atol=1e-9)
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from models.article import ScrapedArticles
+from services.news_pipeline_service import NewsPipelineService
+
+N_LINKS = 300
+
+
+class FakeScraper:
+    def create_session(self):
+        return contextlib.AsyncExitStack()
+
+    async def scrape_site_async(self, url, session):
+        today = datetime.now(timezone.utc).isoformat()
+        articles = ScrapedArticles()
+        for i in range(N_LINKS):
+            articles.append(f"{url}noticia-{i}?utm_source=portada", today)
+        return articles
+
+
+class FakeExtractor:
+    max_concurrent = 4
+    parse_pool = None
+
+    def create_session(self):
+        return contextlib.AsyncExitStack()
+
+    async def extract_content_async(self, url, session, parse_pool):
+        await asyncio.sleep(0)
+        return f"contenido de {url}"
+
+
+class FakeDeduplicator:
+    async def embed_texts_async(self, texts):
+        return np.zeros((len(texts), 4), dtype=np.float32)
+
+
+def make_pipeline():
+    return NewsPipelineService(FakeScraper(), FakeExtractor(), FakeDeduplicator())
+
+
+def test_pipeline_processes_every_link():
+    result = asyncio.run(make_pipeline().run_async(["https://a.es/"]))
+
+    assert len(result.articles) == N_LINKS
+    # Los artículos se guardan con la misma URL canónica que indexa sus contenidos
+    assert list(result.url_contents) == list(result.articles.urls)
+    assert all("utm_source" not in url for url in result.articles.urls)
+    assert len(result.embeddings) == N_LINKS
+
+
+def test_failing_progress_callback_aborts_instead_of_hanging():
+    class StopPipeline(BaseException):
+        pass
+
+    calls = []
+
+    def progress_callback(counts):
+        calls.append(counts)
+        if len(calls) > 3:
+            raise StopPipeline()
+
+    async def run():
+        return await asyncio.wait_for(
+            make_pipeline().run_async(["https://a.es/"], progress_callback),
+            timeout=10
+        )
+
+    with pytest.raises(StopPipeline):
+        asyncio.run(run())
+
+
+def test_failing_stage_cancels_the_others():
+    class BrokenExtractor(FakeExtractor):
+        async def extract_content_async(self, url, session, parse_pool):
+            raise RuntimeError("boom")
+
+    pipeline = NewsPipelineService(FakeScraper(), BrokenExtractor(), FakeDeduplicator())
+
+    async def run():
+        return await asyncio.wait_for(pipeline.run_async(["https://a.es/"]), timeout=10)
+
+    with pytest.raises(ExceptionGroup):
+        asyncio.run(run())
@@ -0,0 +1,26 @@
+import asyncio
+
+from models.article import ScrapedArticles
+from services.scraper_service import NewsScraperService
+
+
+def test_scrape_multiple_stores_one_canonical_url_per_article(monkeypatch):
+    scraper = NewsScraperService()
+    listings = {
+        "https://a.es/": ["https://a.es/noticia-uno?utm_source=portada"],
+        "https://a.es/actualidad/": ["https://a.es/noticia-uno/?fbclid=abc#comentarios"],
+    }
+
+    async def fake_scrape_site_async(url, session, semaphore=None):
+        articles = ScrapedArticles()
+        for article_url in listings[url]:
+            articles.append(article_url, "2026-01-09")
+        return articles
+
+    monkeypatch.setattr(scraper, "scrape_site_async", fake_scrape_site_async)
+    try:
+        articles = asyncio.run(scraper.scrape_multiple_async(list(listings)))
+    finally:
+        scraper.shutdown()
+
+    assert articles.urls == ["https://a.es/noticia-uno"]
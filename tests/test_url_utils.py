@@ -0,0 +1,22 @@
+import pytest
+
+from utils.url_utils import canonicalize_url, url_dedup_key
+
+
+@pytest.mark.parametrize("url", [
+    "https://a.es/noticia-uno?123",
+    "https://a.es/noticia-uno?q=a%20b,c",
+    "https://a.es/noticia-uno?id=3;page=2",
+])
+def test_canonicalize_url_keeps_query_without_tracking(url):
+    assert canonicalize_url(url) == url
+
+
+def test_canonicalize_url_strips_only_tracking_params():
+    url = "HTTPS://A.es/noticia-uno?utm_source=fb&id=3;b=a%20b&fbclid=1#comentarios"
+
+    assert canonicalize_url(url) == "https://a.es/noticia-uno?id=3;b=a%20b"
+
+
+def test_url_dedup_key_ignores_trailing_slash_and_tracking():
+    assert url_dedup_key("https://a.es/noticia-uno/?utm_medium=x") == url_dedup_key("https://a.es/noticia-uno")
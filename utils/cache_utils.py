@@ -0,0 +1,98 @@
+"""Utilidades de cache en memoria y en disco."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+
+
+class LRUCache:
+    """Cache en memoria con expulsión LRU (thread-safe)."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class SQLiteCache:
+    """Cache clave-valor persistente en un fichero SQLite (valores serializados con pickle)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, default: Any = None) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        return pickle.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, blob)
+            )
+            self._conn.commit()
+
+    def set_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """Guarda varios pares (clave, valor) en una sola transacción."""
+        rows = [
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            for key, value in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+
+class LLMCache:
+    """
+    Cache de respuestas de un LLM indexada por el hash de (modelo, mensajes).
+    
+    El backend es intercambiable: cualquier objeto con get/set (LRUCache, SQLiteCache...).
+    """
+
+    def __init__(self, backend: Union[LRUCache, SQLiteCache]):
+        self.backend = backend
+
+    @staticmethod
+    def make_key(model: str, messages: Sequence[Dict[str, str]]) -> str:
+        payload = json.dumps([model, list(messages)], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, messages: Sequence[Dict[str, str]]) -> Optional[Any]:
+        return self.backend.get(self.make_key(model, messages))
+
+    def set(self, model: str, messages: Sequence[Dict[str, str]], value: Any) -> None:
+        self.backend.set(self.make_key(model, messages), value)
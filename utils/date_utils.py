@@ -1,9 +1,11 @@
 """Utilidades para detección y parsing de fechas."""
 
+import functools
 import re
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -23,65 +25,52 @@ MESES_ES = {
     'diciembre': 12, 'dic': 12,
 }
 
+_WS_RE = re.compile(r'\s+')
+
+# Límites de fechas válidas, recalculados como mucho una vez por hora
+BOUNDS_TTL_SECONDS = 3600
+_BOUNDS_CACHE = {'t': None, 'min': None, 'max': None}
+
 
 def parse_date_flexible(date_string: str) -> Optional[str]:
     """
     Intenta parsear una fecha en múltiples formatos.
     
+    Memoizada: las portadas repiten los mismos fragmentos (widgets, fechas de la
+    barra lateral) en muchos enlaces. El resultado depende de la fecha actual (rango
+    válido), así que la cache se indexa también por los límites vigentes y se renueva
+    con ellos en vez de servir resultados de otro momento en un proceso de larga vida.
+    
     Returns:
         Fecha en formato ISO (YYYY-MM-DD) o None
     """
     if not date_string:
         return None
     
+    return _parse_date_cached(date_string, _get_bounds())
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_cached(date_string: str, bounds: Tuple[datetime, datetime]) -> Optional[str]:
+    """parse_date_flexible memoizada por (texto, límites de fechas válidas)."""
     date_string = date_string.strip().lower()
     
     # Limpiar caracteres extra
-    date_string = re.sub(r'\s+', ' ', date_string)
-    
-    # Patrones comunes (en orden de especificidad)
-    patterns = [
-        # ISO: 2026-01-09T10:30:00
-        (r'(\d{4})-(\d{2})-(\d{2})(?:t|\s)', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
-        
-        # ISO simple: 2026-01-09
-        (r'(\d{4})-(\d{2})-(\d{2})', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
-        
-        # dd.mm.yyyy (con puntos)
-        (r'(\d{1,2})\.(\d{1,2})\.(\d{4})', 
-         lambda m: f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}"),
-        
-        # dd/mm/yyyy
-        (r'(\d{1,2})/(\d{1,2})/(\d{4})', 
-         lambda m: f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}"),
-        
-        # dd-mm-yyyy
-        (r'(\d{1,2})-(\d{1,2})-(\d{4})', 
-         lambda m: f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}"),
-        
-        # yyyy/mm/dd
-        (r'(\d{4})/(\d{1,2})/(\d{1,2})', 
-         lambda m: f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"),
-        
-        # "9 de enero de 2026" (con "de")
-        (r'(\d{1,2})\s+de\s+([a-záéíóúñ]+)\s+de\s+(\d{4})', parse_spanish_date),
-        
-        # "9 enero 2026" (SIN "de") - NUEVO
-        (r'(\d{1,2})\s+([a-záéíóúñ]+)\s+(\d{4})', parse_spanish_date),
-        
-        # "enero 9, 2026"
-        (r'([a-záéíóúñ]+)\s+(\d{1,2}),?\s+(\d{4})', parse_spanish_date_reverse),
-        
-        # "9/1/2026" o "09/01/2026" (flexible)
-        (r'(\d{1,2})/(\d{1,2})/(\d{2,4})', parse_flexible_slash_date),
-    ]
-    
-    for pattern, handler in patterns:
-        match = re.search(pattern, date_string)
+    date_string = _WS_RE.sub(' ', date_string)
+    
+    # Rechazo rápido: un único escaneo con la alternativa combinada descarta los textos
+    # sin nada con forma de fecha (la gran mayoría de fragmentos de una portada)
+    if not _MASTER.search(date_string):
+        return None
+    
+    # Prioridad por patrón, no por posición: con varias fechas en el texto
+    # ("actualizado 12/05/2026 ... publicado 2026-05-10") gana el formato más específico
+    for pattern, handler in _PATTERNS:
+        match = pattern.search(date_string)
         if match:
             try:
                 result = handler(match)
-                if result and is_valid_date(result):
+                if result and _is_within(result, bounds):
                     logger.debug(f"Parseado '{date_string}' -> '{result}'")
                     return result
             except Exception as e:
@@ -131,16 +120,78 @@ def parse_flexible_slash_date(match) -> Optional[str]:
     return f"{part3}-{part2:02d}-{part1:02d}"
 
 
-def is_valid_date(date_str: str) -> bool:
-    """Valida que la fecha sea razonable."""
+# Patrones comunes (en orden de especificidad), compilados una sola vez.
+# Se definen tras los handlers que referencian.
+_NAMED_PATTERNS = [
+    # ISO: 2026-01-09T10:30:00
+    ('iso_datetime', r'(\d{4})-(\d{2})-(\d{2})(?:t|\s)', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
+    
+    # ISO simple: 2026-01-09
+    ('iso', r'(\d{4})-(\d{2})-(\d{2})', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
+    
+    # dd.mm.yyyy (con puntos)
+    ('dmy_dot', r'(\d{1,2})\.(\d{1,2})\.(\d{4})', 
+     lambda m: f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}"),
+    
+    # dd/mm/yyyy
+    ('dmy_slash', r'(\d{1,2})/(\d{1,2})/(\d{4})', 
+     lambda m: f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}"),
+    
+    # dd-mm-yyyy
+    ('dmy_dash', r'(\d{1,2})-(\d{1,2})-(\d{4})', 
+     lambda m: f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}"),
+    
+    # yyyy/mm/dd
+    ('ymd_slash', r'(\d{4})/(\d{1,2})/(\d{1,2})', 
+     lambda m: f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"),
+    
+    # "9 de enero de 2026" (con "de")
+    ('es_de', r'(\d{1,2})\s+de\s+([a-záéíóúñ]+)\s+de\s+(\d{4})', parse_spanish_date),
+    
+    # "9 enero 2026" (SIN "de") - NUEVO
+    ('es', r'(\d{1,2})\s+([a-záéíóúñ]+)\s+(\d{4})', parse_spanish_date),
+    
+    # "enero 9, 2026"
+    ('es_reverse', r'([a-záéíóúñ]+)\s+(\d{1,2}),?\s+(\d{4})', parse_spanish_date_reverse),
+    
+    # "9/1/2026" o "09/01/2026" (flexible)
+    ('flexible_slash', r'(\d{1,2})/(\d{1,2})/(\d{2,4})', parse_flexible_slash_date),
+]
+
+_PATTERNS = [(re.compile(pattern), handler) for _, pattern, handler in _NAMED_PATTERNS]
+
+# Alternativa combinada de todos los patrones (sin capturas internas), solo para el
+# rechazo rápido de textos sin fecha
+_MASTER = re.compile('|'.join(
+    f"(?P<{name}>{re.sub(r'[(](?![?])', '(?:', pattern)})"
+    for name, pattern, _ in _NAMED_PATTERNS
+))
+
+
+def _get_bounds() -> Tuple[datetime, datetime]:
+    """Devuelve (min_date, max_date): no más de 5 años en el pasado ni 2 en el futuro."""
+    now_t = time.monotonic()
+    if _BOUNDS_CACHE['t'] is None or now_t - _BOUNDS_CACHE['t'] > BOUNDS_TTL_SECONDS:
+        now = datetime.now()
+        _BOUNDS_CACHE['min'] = datetime(now.year - 5, 1, 1)
+        _BOUNDS_CACHE['max'] = datetime(now.year + 2, 12, 31)
+        _BOUNDS_CACHE['t'] = now_t
+    
+    return _BOUNDS_CACHE['min'], _BOUNDS_CACHE['max']
+
+
+def _is_within(date_str: str, bounds: Tuple[datetime, datetime]) -> bool:
+    """Valida que date_str (YYYY-MM-DD) sea una fecha real dentro de bounds."""
     try:
         date = datetime.strptime(date_str, '%Y-%m-%d')
-        
-        # Rango razonable: no más de 5 años en el pasado ni en el futuro
-        now = datetime.now()
-        min_date = datetime(now.year - 5, 1, 1)
-        max_date = datetime(now.year + 2, 12, 31)
-        
-        return min_date <= date <= max_date
     except ValueError:
-        return False
\ No newline at end of file
+        return False
+    
+    min_date, max_date = bounds
+    return min_date <= date <= max_date
+
+
+def is_valid_date(date_str: str) -> bool:
+    """Valida que la fecha sea razonable."""
+    # Rango razonable: no más de 5 años en el pasado ni 2 en el futuro
+    return _is_within(date_str, _get_bounds())
@@ -1,31 +1,55 @@
 """Utilidades para limpieza del DOM."""
 
-from bs4 import BeautifulSoup
+import re
+
+from bs4 import BeautifulSoup, Tag
+
+_ALWAYS_NOISE_TAGS = frozenset({"script", "style", "noscript"})
+_LAYOUT_TAGS = frozenset({"nav", "footer", "aside"})
+# Una única alternativa compilada (coincide como subcadena: "cookie-banner", "modal-overlay"...)
+_OBVIOUS_NOISE_RE = re.compile("cookie|popup|modal|advertisement")
+
+
+def _has_long_link(tag: Tag) -> bool:
+    """True si el elemento contiene algún enlace con texto largo (se detiene en el primero)."""
+    for element in tag.descendants:
+        if element.name == "a" and element.get("href") is not None:
+            if len(element.get_text(strip=True)) > 25:
+                return True
+    return False
 
 
 def is_likely_noise(tag) -> bool:
     """Identifica elementos de ruido (scripts, ads, navegación)."""
-    if tag.name in ["script", "style", "noscript"]:
+    if tag.name in _ALWAYS_NOISE_TAGS:
         return True
     
-    attrs = " ".join(tag.get("class", []) + [tag.get("id", "")]).lower()
+    classes = tag.get("class")
+    tag_id = tag.get("id")
+    if classes or tag_id:
+        attrs = " ".join(classes or ()).lower() + " " + (tag_id or "").lower()
+        if _OBVIOUS_NOISE_RE.search(attrs):
+            return True
     
-    obvious_noise = ["cookie", "popup", "modal", "advertisement"]
-    if any(word in attrs for word in obvious_noise):
-        return True
-    
-    if tag.name in ["nav", "footer", "aside"]:
-        for a in tag.find_all("a", href=True):
-            if len(a.get_text(strip=True)) > 25:
-                return False
-        return True
+    if tag.name in _LAYOUT_TAGS:
+        return not _has_long_link(tag)
     
     return False
 
 
 def prune_noise(soup: BeautifulSoup) -> None:
-    """Elimina ruido del DOM (modifica el soup in-place)."""
-    tags_to_remove = [tag for tag in soup.find_all(True) if is_likely_noise(tag)]
+    """
+    Elimina ruido del DOM (modifica el soup in-place).
+    
+    Recorrido en profundidad con pila: cada elemento de ruido se elimina en cuanto
+    se encuentra y sus descendientes no llegan a visitarse.
+    """
+    stack = [child for child in soup.children if isinstance(child, Tag)]
     
-    for tag in tags_to_remove:
-        tag.decompose()
\ No newline at end of file
+    while stack:
+        tag = stack.pop()
+        if is_likely_noise(tag):
+            tag.decompose()
+            continue
+        
+        stack.extend(child for child in reversed(tag.contents) if isinstance(child, Tag))
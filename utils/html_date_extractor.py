@@ -1,20 +1,47 @@
 """Extractor de fechas desde HTML."""
 
 from bs4 import BeautifulSoup, Tag
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import re
 import logging
 
-from utils.date_utils import parse_date_flexible
+from utils.date_utils import MESES_ES, parse_date_flexible
 
 logger = logging.getLogger(__name__)
 
+# Patrones compilados una sola vez (se usan para cada enlace de cada portada)
+_CONTAINER_RE = re.compile(r'(node|noticia|news|item|post|entry)', re.I)
+# Clases comunes de fecha; "noticia-fecha" es específico del ayuntamiento de Boadilla
+_DATE_CLASS_RE = re.compile(
+    r'(date|fecha|published|entry-date|post-date|time|timestamp|noticia-fecha)', re.I
+)
+
+# Fragmentos con forma de fecha (los mismos formatos que entiende parse_date_flexible)
+_MONTH_RE = '(?:' + '|'.join(sorted(MESES_ES, key=len, reverse=True)) + ')'
+_DATE_SHAPE = re.compile(
+    r'(?<!\d)(?:'
+    r'\d{4}[-/]\d{1,2}[-/]\d{1,2}'                                   # 2026-01-09(T...), 2026/1/9
+    r'|\d{1,2}[/.\-]\d{1,2}[/.\-]\d{2,4}'                           # 9/1/2026, 09.01.2026, 9-1-26
+    rf'|\d{{1,2}}\s+(?:de\s+)?{_MONTH_RE}\s+(?:de\s+)?\d{{4}}'       # 9 de enero de 2026, 9 ene 2026
+    rf'|(?<!\w){_MONTH_RE}\s+\d{{1,2}},?\s+\d{{4}}'                   # enero 9, 2026
+    r')(?!\d)',
+    re.I
+)
+
+
+# Resultados de _find_date_in_element por (id(elemento), deep); válida solo para una página
+ContainerCache = Dict[Tuple[int, bool], Optional[str]]
+
 
 class HTMLDateExtractor:
     """Extrae fechas de artículos desde HTML."""
     
     @staticmethod
-    def extract_date_from_link(a_tag: Tag, soup: BeautifulSoup) -> Optional[str]:
+    def extract_date_from_link(
+        a_tag: Tag,
+        soup: BeautifulSoup,
+        container_cache: Optional[ContainerCache] = None
+    ) -> Optional[str]:
         """
         Extrae la fecha más cercana a un enlace de artículo.
         
@@ -24,21 +51,36 @@ class HTMLDateExtractor:
         3. Buscar en hermanos anteriores del enlace
         4. Buscar en elementos cercanos al enlace
         5. Buscar subiendo en el árbol DOM
+        
+        Args:
+            a_tag: Enlace del artículo
+            soup: Página completa
+            container_cache: Cache por página de las búsquedas en contenedores; los enlaces
+                de un mismo listado comparten ancestros y así cada uno se examina una vez
         """
+        if container_cache is None:
+            container_cache = {}
+        
+        def find_in(element: Tag, deep: bool = False) -> Optional[str]:
+            key = (id(element), deep)
+            if key not in container_cache:
+                container_cache[key] = HTMLDateExtractor._find_date_in_element(element, deep)
+            return container_cache[key]
+        
         # Estrategia 1: Metadatos (si el enlace está dentro de un article)
         article = a_tag.find_parent('article')
         if article:
-            date = HTMLDateExtractor._find_date_in_element(article, deep=True)
+            date = find_in(article, deep=True)
             if date:
                 logger.debug(f"Fecha encontrada en <article>: {date}")
                 return date
         
         # Estrategia 2: Buscar en el div contenedor más grande
-        # Subir hasta encontrar un div con clase que parezca contenedor de noticia
-        container = a_tag.find_parent(['div', 'section'], 
-                                     class_=re.compile(r'(node|noticia|news|item|post|entry)', re.I))
+        # Subir hasta encontrar un div con clase que parezca contenedor de noticia.
+        # Los contenedores dentro del <article> ya se han examinado en profundidad
+        container = (article or a_tag).find_parent(['div', 'section'], class_=_CONTAINER_RE)
         if container:
-            date = HTMLDateExtractor._find_date_in_element(container, deep=True)
+            date = find_in(container, deep=True)
             if date:
                 logger.debug(f"Fecha encontrada en contenedor: {date}")
                 return date
@@ -57,9 +99,9 @@ class HTMLDateExtractor:
                     logger.debug(f"Fecha encontrada en hermano: {text} -> {date}")
                     return date
         
-        # Estrategia 4: Buscar en el contenedor padre directo
+        # Estrategia 4: Buscar en el contenedor padre directo (salvo que sea el <body>)
         parent = a_tag.parent
-        if parent:
+        if parent and parent.name not in ('body', 'html', '[document]'):
             for child in parent.children:
                 if child == a_tag:
                     continue
@@ -72,7 +114,7 @@ class HTMLDateExtractor:
                             logger.debug(f"Fecha encontrada en hijo del padre: {text} -> {date}")
                             return date
             
-            date = HTMLDateExtractor._find_date_in_element(parent)
+            date = find_in(parent)
             if date:
                 return date
         
@@ -83,7 +125,7 @@ class HTMLDateExtractor:
             if not current:
                 break
             
-            date = HTMLDateExtractor._find_date_in_element(current)
+            date = find_in(current)
             if date:
                 logger.debug(f"Fecha encontrada subiendo {level+1} niveles")
                 return date
@@ -113,46 +155,31 @@ class HTMLDateExtractor:
             if date:
                 return date
         
-        # 3. Buscar clases comunes de fecha (con diferentes patrones)
-        date_class_patterns = [
-            r'date',
-            r'fecha',
-            r'published',
-            r'entry-date',
-            r'post-date',
-            r'time',
-            r'timestamp',
-            r'noticia-fecha',  # Específico para ayuntamiento boadilla
-        ]
+        # 3. Buscar clases comunes de fecha (una sola búsqueda con todos los patrones)
+        for date_elem in element.find_all(class_=_DATE_CLASS_RE):
+            # Buscar dentro del elemento encontrado
+            text = date_elem.get_text(strip=True)
+            date = parse_date_flexible(text)
+            if date:
+                return date
+            
+            # También buscar en spans hijos (como date-display-single), recorriendo los
+            # descendientes de forma perezosa para parar en el primer acierto
+            for span in date_elem.descendants:
+                if getattr(span, 'name', None) not in ('span', 'div'):
+                    continue
+                text = span.get_text(strip=True)
+                if text:
+                    date = parse_date_flexible(text)
+                    if date:
+                        return date
         
-        for pattern in date_class_patterns:
-            date_elem = element.find(class_=re.compile(pattern, re.I))
-            if date_elem:
-                # Buscar dentro del elemento encontrado
-                text = date_elem.get_text(strip=True)
-                date = parse_date_flexible(text)
+        # 4. Si deep=True, escanear una sola vez el texto del elemento y parsear solo
+        # los fragmentos con forma de fecha
+        if deep:
+            for match in _DATE_SHAPE.finditer(element.get_text(" ", strip=True)):
+                date = parse_date_flexible(match.group())
                 if date:
                     return date
-                
-                # También buscar en spans hijos (como date-display-single)
-                for span in date_elem.find_all(['span', 'div'], recursive=True):
-                    text = span.get_text(strip=True)
-                    if text:
-                        date = parse_date_flexible(text)
-                        if date:
-                            return date
         
-        # 4. Si deep=True, buscar en todos los textos cortos del elemento
-        if deep:
-            for child in element.descendants:
-                if hasattr(child, 'get_text') and child.name:
-                    text = child.get_text(strip=True)
-                    # Solo textos muy cortos (fechas suelen ser <30 caracteres)
-                    if text and 5 < len(text) < 30:
-                        # Evitar buscar en textos largos (descripciones, etc)
-                        if not child.find_all(['p', 'article']):
-                            date = parse_date_flexible(text)
-                            if date:
-                                return date
-        
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,35 @@
+"""Utilidades HTTP compartidas por el scraper y el extractor de contenido."""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+# Sin Accept-Encoding: aiohttp añade por su cuenta las codificaciones que sabe decodificar
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+
+def create_http_session(pool_connections: int = 32, pool_maxsize: int = 64) -> requests.Session:
+    """
+    Crea una sesión requests con cabeceras comunes, compresión y pool keep-alive
+    (reutiliza TCP+TLS entre peticiones al mismo host) con reintentos ante 429/5xx.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    # Comprimir respuestas: urllib3 solo anuncia br/zstd si puede decodificarlos
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504]
+        )
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
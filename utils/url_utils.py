@@ -1,27 +1,38 @@
 """Utilidades para validación y limpieza de URLs."""
 
-from urllib.parse import urlparse
+from collections import defaultdict
+import re
+from typing import Dict, Iterable, Tuple
+from urllib.parse import unquote_plus, urldefrag, urlparse, urlsplit, urlunsplit
+
+# Fragmentos que descartan una URL (categorías, autores, redes sociales, paginación...)
+URL_BLACKLIST = (
+    "/category/", "/categories/", "/categoria/",
+    "/autor/", "/author/", "/writer/",
+    "/tag/", "/tags/", "/tema/", "/etiqueta/",
+    "addthis.com", "facebook.com", "twitter.com", "whatsapp.com",
+    "/faqs/", "/aviso", "/legal", "/privacidad", "/cookies",
+    "/busqueda/", "/search", "/archivo/",
+    "?page=", "&page=", "/noticia-madrid/",
+    "mailto:", "tel:", "/noticia-opinion",
+    "/empresas/zona", "/noticia-comunidad-de-madrid/",
+    "/dias-de-lluvia", "/noticias-96.aspx",
+    "/www.soydemadrid.com/noticias-",
+    "?items_per_page=",
+)
+# Una única alternativa compilada: un escaneo en C en vez de ~30 búsquedas de subcadena
+_BLACKLIST_RE = re.compile("|".join(map(re.escape, URL_BLACKLIST)))
+
+# Parámetros de tracking que no cambian el contenido (la misma noticia compartida desde varios sitios)
+_TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "yclid", "msclkid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "ocid",
+})
+_QUERY_SEP_RE = re.compile(r"([&;])")
 
 
 def is_valid_article_url(url: str) -> bool:
     """Valida si una URL es potencialmente un artículo."""
-    url_lower = url.lower()
-    
-    blacklist = [
-        "/category/", "/categories/", "/categoria/",
-        "/autor/", "/author/", "/writer/",
-        "/tag/", "/tags/", "/tema/", "/etiqueta/",
-        "addthis.com", "facebook.com", "twitter.com", "whatsapp.com",
-        "/faqs/", "/aviso", "/legal", "/privacidad", "/cookies",
-        "/busqueda/", "/search", "/archivo/",
-        "?page=", "&page=", "/noticia-madrid/",
-        "mailto:", "tel:", "/noticia-opinion",
-        "/empresas/zona", "/noticia-comunidad-de-madrid/",
-        "/dias-de-lluvia", "/noticias-96.aspx",
-        "/www.soydemadrid.com/noticias-",
-        "?items_per_page="
-    ]
-    
     parsed = urlparse(url)
     
     # Homepage
@@ -35,7 +46,7 @@ def is_valid_article_url(url: str) -> bool:
         if "-" not in last_segment:
             return False
     
-    return not any(pattern in url_lower for pattern in blacklist)
+    return _BLACKLIST_RE.search(url.lower()) is None
 
 
 def clean_url(url: str) -> str:
@@ -48,4 +59,59 @@ def clean_url(url: str) -> str:
                 base = url.split("/noticias-busqueda/")[0]
                 return f"{base}/{rest[6]}"
     
-    return url
\ No newline at end of file
+    return url
+
+
+def group_urls_by_host(urls: Iterable[str]) -> Dict[str, Tuple[str, ...]]:
+    """Agrupa URLs por host manteniendo el orden de aparición."""
+    by_host = defaultdict(list)
+    for url in urls:
+        by_host[urlsplit(url).netloc].append(url)
+    
+    return {host: tuple(host_urls) for host, host_urls in by_host.items()}
+
+
+def _is_tracking_param(param: str) -> bool:
+    key = unquote_plus(param.split("=", 1)[0]).lower()
+    return key.startswith("utm_") or key in _TRACKING_PARAMS
+
+
+def _strip_tracking(query: str) -> str:
+    """
+    Elimina los parámetros utm_* y demás parámetros de tracking de una query string.
+    
+    El resto de la query se conserva byte a byte (sin re-codificar ni cambiar
+    separadores) y, si no hay nada que quitar, se devuelve tal cual.
+    """
+    tokens = _QUERY_SEP_RE.split(query)
+    params, separators = tokens[0::2], [""] + tokens[1::2]
+    
+    kept = [(sep, param) for sep, param in zip(separators, params) if not _is_tracking_param(param)]
+    if len(kept) == len(params):
+        return query
+    
+    return "".join((sep if i else "") + param for i, (sep, param) in enumerate(kept))
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normaliza una URL para deduplicar: sin fragmento, sin parámetros de tracking
+    y con esquema/host en minúsculas.
+    
+    La URL resultante sigue siendo descargable (el path no se toca).
+    """
+    url, _ = urldefrag(url)
+    parts = urlsplit(url)
+    query = _strip_tracking(parts.query) if parts.query else ""
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+
+def url_dedup_key(url: str) -> Tuple[str, str, str, str]:
+    """
+    Clave de deduplicación de una URL: (esquema, host, path sin barra final, query).
+    
+    Agrupa variantes de la misma noticia que solo difieren en fragmento, tracking
+    o barra final.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    return parts.scheme, parts.netloc, parts.path.rstrip("/"), parts.query